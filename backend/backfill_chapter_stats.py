@@ -0,0 +1,61 @@
+"""
+Rebuild per-chapter progress aggregates (progress.chapter_stats) from quiz_results.
+
+chapter_stats is maintained on write since it was introduced; quizzes taken
+before that are only in quiz_results. By default only users whose aggregates
+do not add up to their total_quizzes are rebuilt. A user who submits a quiz
+while the script runs is skipped and reported; run it again, ideally while
+the backend is stopped.
+
+Usage:
+    python backfill_chapter_stats.py            # rebuild users with missing aggregates
+    python backfill_chapter_stats.py --all      # rebuild every user
+    python backfill_chapter_stats.py --dry-run  # only report what would change
+"""
+import argparse
+import asyncio
+import sys
+
+from pymongo import ASCENDING
+
+import server
+
+
+def needs_backfill(progress: dict) -> bool:
+    attempts = sum(stats.get("attempts", 0) for stats in progress.get("chapter_stats", {}).values())
+    return attempts != progress.get("total_quizzes", 0)
+
+
+async def main(args) -> int:
+    database = server.db
+    rebuilt = skipped = 0
+    async for progress in database.progress.find({}, {"_id": 0, "user_id": 1, "total_quizzes": 1, "chapter_stats": 1}):
+        if not args.all and not needs_backfill(progress):
+            continue
+        results = database.quiz_results.find(
+            {"user_id": progress["user_id"]}, {"_id": 0, "chapter": 1, "score": 1, "total": 1, "completed_at": 1}
+        ).sort([("completed_at", ASCENDING), ("id", ASCENDING)])
+        chapter_stats = server.chapter_stats_from_results(await results.to_list(None))
+        if args.dry_run:
+            print(f"{progress['user_id']}: {len(chapter_stats)} chapters")
+            rebuilt += 1
+            continue
+        # Only write if no quiz was counted in the meantime
+        result = await database.progress.update_one(
+            {"user_id": progress["user_id"], "total_quizzes": progress.get("total_quizzes", 0)},
+            {"$set": {"chapter_stats": chapter_stats}}
+        )
+        if result.matched_count:
+            rebuilt += 1
+        else:
+            skipped += 1
+            print(f"✗ {progress['user_id']}: changed during the backfill, run again")
+    print(f"✓ {'Would rebuild' if args.dry_run else 'Rebuilt'} chapter_stats for {rebuilt} users")
+    return 1 if skipped else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild progress.chapter_stats from quiz_results")
+    parser.add_argument("--all", action="store_true", help="Rebuild every user, not only inconsistent ones")
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing")
+    sys.exit(asyncio.run(main(parser.parse_args())))
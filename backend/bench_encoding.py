@@ -0,0 +1,89 @@
+"""
+Compare the JSON encoding paths for the largest API payloads.
+
+    default   jsonable_encoder + stdlib json (FastAPI's JSONResponse)
+    validated response_model validation + jsonable_encoder + response class
+    encoder   jsonable_encoder + the app's response class
+    trusted   the app's response class only (what trusted_response does)
+
+Usage:
+    python bench_encoding.py              # 2000 rounds per payload
+    python bench_encoding.py --rounds 500
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+import server
+
+
+def payloads() -> dict:
+    content = server.current_content()
+    questions = [q for chapter in content.questions_by_chapter for q in content.questions_by_chapter[chapter]]
+    exam = server.build_exam(1, server.EXAM_QUESTION_COUNT)
+    results = [
+        {"question_id": q["id"], "selected": 0, "is_correct": q["correct_answer"] == 0,
+         "correct": q["correct_answer"], "explanation": q["explanation"]}
+        for q in questions[:10]
+    ]
+    now = datetime.now(timezone.utc).isoformat()
+    history = [
+        {"id": str(uuid.uuid4()), "user_id": "u", "chapter": 1 + i % 5, "score": 7, "total": 10,
+         "percentage": 70.0, "completed_at": now}
+        for i in range(10)
+    ]
+    progress = {
+        "user_id": "u", "total_quizzes": 10, "total_correct": 70, "total_questions": 100,
+        "chapters_completed": [1, 2], "current_week": 3, "streak_days": 4, "last_activity": now,
+        "flashcards_reviewed": 12, "chapter_stats": {}, "quiz_history": history
+    }
+    return {
+        "flashcards": (list(content.flashcards_by_id.values()), None),
+        "questions/{chapter}": (list(content.questions_by_chapter[1]), List[server.QuizQuestion]),
+        "exam (60 questions)": (exam, None),
+        "quiz/submit": ({"id": "x", "score": 7, "total": 10, "percentage": 70.0, "results": results}, server.QuizSubmitResponse),
+        "progress": (progress, server.ProgressResponse),
+    }
+
+
+def measure(fn, rounds: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def main(rounds: int):
+    response_class = server.JSON_RESPONSE_CLASS
+    print(f"Response class: {response_class.__name__}, {rounds} rounds, µs per response\n")
+    print(f"{'payload':<22}{'bytes':>8}{'default':>10}{'validated':>11}{'encoder':>10}{'trusted':>10}{'speedup':>9}")
+    for name, (payload, model) in payloads().items():
+        timings = {
+            "default": measure(lambda: JSONResponse(jsonable_encoder(payload)), rounds),
+            "encoder": measure(lambda: response_class(jsonable_encoder(payload)), rounds),
+            "trusted": measure(lambda: response_class(payload), rounds),
+        }
+        if model is not None:
+            adapter = TypeAdapter(model)
+            timings["validated"] = measure(
+                lambda: response_class(jsonable_encoder(adapter.dump_python(adapter.validate_python(payload)))), rounds
+            )
+        size = len(response_class(payload).body)
+        validated = f"{timings['validated']:>11.1f}" if "validated" in timings else f"{'-':>11}"
+        print(
+            f"{name:<22}{size:>8}{timings['default']:>10.1f}{validated}{timings['encoder']:>10.1f}"
+            f"{timings['trusted']:>10.1f}{timings['default'] / timings['trusted']:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000)
+    main(parser.parse_args().rounds)
@@ -0,0 +1,292 @@
+"""
+Latency and throughput benchmark for the API hot paths.
+
+Runs against an in-memory MongoDB (mongomock-motor) or a local mongod and a
+stub AI provider, so the numbers only reflect this server's own work.
+
+    inprocess  requests go straight to the ASGI app (httpx ASGITransport)
+    uvicorn    a local uvicorn process is driven over several HTTP connections
+
+Baselines are machine specific: save one on the machine that later runs the
+comparison. A scenario regresses when its p50 or p99 latency grows or its
+throughput drops by more than the tolerance, or when any request fails.
+
+Usage:
+    python benchmark.py                                   # in-process, all scenarios
+    python benchmark.py --mode uvicorn --connections 32
+    python benchmark.py --save-baseline bench_baseline.json
+    python benchmark.py --baseline bench_baseline.json    # exit 1 on regression
+    python benchmark.py --mongo-url mongodb://localhost:27017 --scenarios questions,progress
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+import server
+
+SCENARIOS = ("questions", "quiz_submit", "progress", "flashcards", "ai_explain")
+BENCH_DB_PREFIX = "linux_bench_"
+STUB_EXPLANATION = "Option B is correct because it matches the requirement described in the question."
+
+
+# ============ BACKEND STUBS ============
+
+async def stub_ai_provider(request: httpx.Request) -> httpx.Response:
+    """OpenAI-compatible completion endpoint that answers immediately"""
+    return httpx.Response(200, json={"choices": [{"message": {"role": "assistant", "content": STUB_EXPLANATION}}]})
+
+
+def install_backends(mongo_url: str, db_name: str) -> None:
+    if mongo_url:
+        server.client = server.AsyncIOMotorClient(mongo_url)
+    else:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            print("mongomock-motor is not installed: pip install mongomock-motor (or pass --mongo-url)")
+            sys.exit(2)
+        server.client = AsyncMongoMockClient()
+    server.db = server.client[db_name]
+    # get_ai_client keeps an open client, so the stub is never replaced
+    server.AI_CLIENTS["openai"] = httpx.AsyncClient(transport=httpx.MockTransport(stub_ai_provider))
+
+
+def serve(port: int, mongo_url: str, db_name: str) -> None:
+    """Entry point of the uvicorn child process"""
+    import uvicorn
+    install_backends(mongo_url, db_name)
+    uvicorn.run(server.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+# ============ SCENARIOS ============
+
+async def prepare(client: httpx.AsyncClient) -> dict:
+    """Create a user with some history and collect the request bodies"""
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    response = await client.post("/api/auth/register", json={"email": email, "password": "benchmark", "name": "Bench"})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+    questions = list(server.current_content().questions_by_chapter[1])[:10]
+    answers = [{"question_id": q["id"], "selected_answer": (q["correct_answer"] + i % 2) % 4} for i, q in enumerate(questions)]
+    for _ in range(10):
+        (await client.post("/api/quiz/submit?chapter=1", json=answers, headers=headers)).raise_for_status()
+
+    explain = [
+        {"question": q["question"], "options": q["options"], "correct_answer": q["correct_answer"], "user_answer": 0,
+         "provider": "openai", "api_key": "bench", "no_cache": True}
+        for q in questions
+    ]
+    return {"headers": headers, "answers": answers, "explain": explain}
+
+
+def scenario_request(name: str, client: httpx.AsyncClient, ctx: dict, i: int):
+    if name == "questions":
+        return client.get(f"/api/questions/{i % 5 + 1}?limit=10")
+    if name == "quiz_submit":
+        return client.post("/api/quiz/submit?chapter=1", json=ctx["answers"], headers=ctx["headers"])
+    if name == "progress":
+        return client.get("/api/progress", headers=ctx["headers"])
+    if name == "flashcards":
+        return client.get("/api/flashcards")
+    # The stub answers instantly and no_cache skips the cache lookup and write, so
+    # this measures prompt building and the provider round trip. Each request asks
+    # a distinct question, or concurrent identical calls would share one round trip.
+    payload = ctx["explain"][i % len(ctx["explain"])]
+    return client.post("/api/ai/explain", json={**payload, "question": f"{payload['question']} ({i})"})
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(name: str, client: httpx.AsyncClient, ctx: dict, total: int, concurrency: int, warmup: int) -> dict:
+    for i in range(warmup):
+        await scenario_request(name, client, ctx, i)
+
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                response = await scenario_request(name, client, ctx, i)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+# ============ RUNNERS ============
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_up(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            if (await client.get("/api/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+async def run(args, db_name: str) -> dict:
+    results = {}
+    process = None
+    if args.mode == "inprocess":
+        install_backends(args.mongo_url, db_name)
+        await server.ensure_indexes(server.db)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://bench", timeout=60)
+    else:
+        port = _free_port()
+        command = [sys.executable, os.path.abspath(__file__), "--serve", str(port), "--db-name", db_name]
+        if args.mongo_url:
+            command += ["--mongo-url", args.mongo_url]
+        process = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)))
+        limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60)
+    try:
+        if process is not None:
+            await _wait_until_up(client, process)
+        ctx = await prepare(client)
+        for name in args.scenarios:
+            results[name] = await run_scenario(name, client, ctx, args.requests, args.connections, args.warmup)
+            print_row(name, results[name])
+    finally:
+        await client.aclose()
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        if args.mongo_url:
+            await server.AsyncIOMotorClient(args.mongo_url).drop_database(db_name)
+    return results
+
+
+# ============ BASELINES ============
+
+def compare(results: dict, baseline: dict, tolerance: float, p99_tolerance: float) -> list:
+    problems = []
+    for name, current in results.items():
+        if current["errors"]:
+            problems.append(f"{name}: {current['errors']} failed requests")
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        if current["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p50 {current['p50_ms']} ms > baseline {base['p50_ms']} ms")
+        if current["p99_ms"] > base["p99_ms"] * (1 + p99_tolerance):
+            problems.append(f"{name}: p99 {current['p99_ms']} ms > baseline {base['p99_ms']} ms")
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            problems.append(f"{name}: {current['rps']} req/s < baseline {base['rps']} req/s")
+    return problems
+
+
+def print_row(name: str, result: dict) -> None:
+    print(f"{name:<14}{result['requests']:>9}{result['errors']:>8}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests per scenario")
+    parser.add_argument("--connections", type=int, default=16, help="concurrent requests / HTTP connections")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--mongo-url", default="", help="local mongod instead of mongomock; uses a throwaway database")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--baseline", metavar="PATH", help="fail if results regress against this file")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed p50 / req/s change (0.3 = 30%%)")
+    parser.add_argument("--p99-tolerance", type=float, default=0.6)
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    parser.add_argument("--db-name", default=f"{BENCH_DB_PREFIX}{os.getpid()}", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Per-request log lines would dominate the measurement
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if args.serve:
+        serve(args.serve, args.mongo_url, args.db_name)
+        return 0
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if (baseline["mode"], baseline["connections"]) != (args.mode, args.connections):
+            print(f"✗ Baseline was taken with --mode {baseline['mode']} --connections {baseline['connections']}")
+            return 2
+
+    print(f"Mode: {args.mode}, {args.connections} connections, {args.requests} requests per scenario, "
+          f"{'mongod' if args.mongo_url else 'mongomock'}, {server.JSON_RESPONSE_CLASS.__name__}\n")
+    print(f"{'scenario':<14}{'requests':>9}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    results = asyncio.run(run(args, args.db_name))
+
+    if args.save_baseline:
+        report = {
+            "mode": args.mode,
+            "connections": args.connections,
+            "requests": args.requests,
+            "backend": "mongod" if args.mongo_url else "mongomock",
+            "python": platform.python_version(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "scenarios": results,
+        }
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Baseline saved to {args.save_baseline}")
+
+    problems = compare(results, baseline or {"scenarios": {}}, args.tolerance, args.p99_tolerance)
+    for problem in problems:
+        print(f"✗ {problem}")
+    if problems:
+        return 1
+    if baseline:
+        print("\n✓ No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+Create the MongoDB indexes used by the API and verify that no hot query
+plans a collection scan.
+
+Usage:
+    python check_indexes.py              # against MONGO_URL / DB_NAME from .env
+    python check_indexes.py --mongomock  # in-memory, needs mongomock-motor
+"""
+import asyncio
+import sys
+
+import server
+
+
+async def main(use_mongomock: bool) -> int:
+    if use_mongomock:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            print("mongomock-motor is not installed: pip install mongomock-motor")
+            return 2
+        database = AsyncMongoMockClient()[server.db_name]
+    else:
+        database = server.db
+
+    failures = await server.ensure_indexes(database)
+    problems = failures + await server.check_query_plans(database)
+    for problem in problems:
+        print(f"✗ {problem}")
+    if problems:
+        return 1
+    print(f"✓ {len(server.HOT_QUERIES)} hot queries use an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main("--mongomock" in sys.argv[1:])))
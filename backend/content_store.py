@@ -0,0 +1,287 @@
+"""
+Question bank storage for the Linux+ XK0-006 Learning App.
+
+Content is edited as versioned JSON sources and compiled by a build step
+into a memory-mappable bank with an offset index, so workers only parse
+the chapters they actually serve.
+
+Sources (edited by hand):
+    content/questions.json    {"format": 1, "questions": [...]}
+    content/flashcards.json   {"format": 1, "flashcards": [...]}
+
+Build output (generated):
+    content/build/bank-<version>.ndjson   one record per line, grouped by chapter
+    content/build/bank.index.json         bank file name, byte range per chapter,
+                                          id -> (chapter, position)
+
+Each build writes a new bank file and then replaces the index, so the index
+is the single commit point: a reader that opened the previous version keeps
+its own mapping, and a reader that opens the new index finds its bank.
+
+Usage:
+    python content_store.py          # validate and build
+    python content_store.py --check  # validate only
+"""
+import hashlib
+import json
+import mmap
+import os
+import sys
+import uuid
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BANK_FORMAT = 1
+KINDS = ("questions", "flashcards")
+SOURCE_FILES = {"questions": "questions.json", "flashcards": "flashcards.json"}
+BUILD_DIR = "build"
+BANK_PREFIX = "bank-"
+INDEX_FILE = "bank.index.json"
+
+# field -> expected type, per kind
+REQUIRED_FIELDS = {
+    "questions": {"id": str, "chapter": int, "question": str, "options": list, "correct_answer": int, "explanation": str},
+    "flashcards": {"id": str, "chapter": int, "front": str, "back": str, "category": str},
+}
+
+
+class ContentError(Exception):
+    """Invalid or unreadable content sources"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+def _source_hashes(content_dir: Path) -> Dict[str, str]:
+    return {
+        name: hashlib.sha256((content_dir / name).read_bytes()).hexdigest()
+        for name in SOURCE_FILES.values()
+    }
+
+
+def load_sources(content_dir: Path) -> Dict[str, list]:
+    sources = {}
+    for kind, name in SOURCE_FILES.items():
+        path = content_dir / name
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            raise ContentError([f"{name}: {e}"])
+        if data.get("format") != BANK_FORMAT:
+            raise ContentError([f"{name}: unsupported format {data.get('format')!r}, expected {BANK_FORMAT}"])
+        sources[kind] = data.get(kind, [])
+    return sources
+
+
+def validate(sources: Dict[str, list], chapters: Optional[set] = None) -> List[str]:
+    """Return a list of problems; an empty list means the content is valid"""
+    errors = []
+    for kind in KINDS:
+        seen = set()
+        for position, record in enumerate(sources.get(kind, [])):
+            label = f"{kind}[{position}] ({record.get('id', '?') if isinstance(record, dict) else '?'})"
+            if not isinstance(record, dict):
+                errors.append(f"{label}: not an object")
+                continue
+            for field, expected in REQUIRED_FIELDS[kind].items():
+                if not isinstance(record.get(field), expected) or isinstance(record.get(field), bool):
+                    errors.append(f"{label}: '{field}' must be {expected.__name__}")
+            if record.get("id") in seen:
+                errors.append(f"{label}: duplicate id")
+            seen.add(record.get("id"))
+            chapter = record.get("chapter")
+            if isinstance(chapter, int) and (chapter < 1 or (chapters is not None and chapter not in chapters)):
+                errors.append(f"{label}: unknown chapter {chapter}")
+            if kind == "questions" and isinstance(record.get("options"), list):
+                options = record["options"]
+                if len(options) < 2 or not all(isinstance(o, str) and o for o in options):
+                    errors.append(f"{label}: needs at least two non-empty options")
+                answer = record.get("correct_answer")
+                if isinstance(answer, int) and not 0 <= answer < len(options):
+                    errors.append(f"{label}: correct_answer out of range")
+    return errors
+
+
+def build(content_dir: Path, chapters: Optional[set] = None) -> dict:
+    """Validate the sources and write the bank and its index; returns the index"""
+    content_dir = Path(content_dir)
+    sources = load_sources(content_dir)
+    errors = validate(sources, chapters)
+    if errors:
+        raise ContentError(errors)
+
+    bank = bytearray()
+    index = {"format": BANK_FORMAT, "sources": _source_hashes(content_dir)}
+    for kind in KINDS:
+        by_chapter = {}
+        for record in sources[kind]:
+            by_chapter.setdefault(record["chapter"], []).append(record)
+        section = {"chapters": {}, "ids": {}}
+        for chapter in sorted(by_chapter):
+            start = len(bank)
+            for position, record in enumerate(by_chapter[chapter]):
+                bank += json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+                section["ids"][record["id"]] = [chapter, position]
+            section["chapters"][str(chapter)] = [start, len(bank) - start, len(by_chapter[chapter])]
+        index[kind] = section
+    index["version"] = hashlib.sha256(bank).hexdigest()[:12]
+
+    index["bank"] = f"{BANK_PREFIX}{index['version']}.ndjson"
+
+    build_dir = content_dir / BUILD_DIR
+    build_dir.mkdir(exist_ok=True)
+    # Write to temporary files and rename, so readers never see a half-written bank;
+    # the bank goes first because the index refers to it
+    for name, payload in ((index["bank"], bytes(bank)), (INDEX_FILE, json.dumps(index).encode("utf-8"))):
+        # Unique per build: other workers or threads may be building at the same time
+        tmp = build_dir / f".{name}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        tmp.write_bytes(payload)
+        os.replace(tmp, build_dir / name)
+    # Older banks may still be mapped by running workers; unlinking is safe for them
+    # on POSIX, while Windows refuses it. Cleanup never fails the build: a bank that
+    # is still in use is removed by a later build.
+    for stale in build_dir.glob(f"{BANK_PREFIX}*.ndjson"):
+        if stale.name != index["bank"]:
+            try:
+                stale.unlink(missing_ok=True)
+            except OSError:
+                pass
+    return index
+
+
+def needs_build(content_dir: Path) -> bool:
+    build_dir = Path(content_dir) / BUILD_DIR
+    try:
+        index = json.loads((build_dir / INDEX_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return True
+    if index.get("format") != BANK_FORMAT or not (build_dir / index.get("bank", "")).is_file():
+        return True
+    return index.get("sources") != _source_hashes(Path(content_dir))
+
+
+class ContentBank:
+    """Read-only view of a built bank; chapters are parsed on first access"""
+
+    def __init__(self, build_dir: Path):
+        build_dir = Path(build_dir)
+        self.index = json.loads((build_dir / INDEX_FILE).read_text(encoding="utf-8"))
+        if self.index.get("format") != BANK_FORMAT:
+            raise ContentError([f"{build_dir / INDEX_FILE}: unsupported format {self.index.get('format')!r}"])
+        self.version = self.index["version"]
+        with open(build_dir / self.index["bank"], "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        self._chapters = {}
+
+    def chapters(self, kind: str) -> List[int]:
+        return [int(chapter) for chapter in self.index[kind]["chapters"]]
+
+    def count(self, kind: str, chapter: int) -> int:
+        entry = self.index[kind]["chapters"].get(str(chapter))
+        return entry[2] if entry else 0
+
+    def ids(self, kind: str) -> dict:
+        return self.index[kind]["ids"]
+
+    def chapter(self, kind: str, chapter: int) -> tuple:
+        key = (kind, chapter)
+        records = self._chapters.get(key)
+        if records is None:
+            entry = self.index[kind]["chapters"].get(str(chapter))
+            if entry is None:
+                return ()
+            offset, length, _ = entry
+            records = tuple(json.loads(line) for line in self._map[offset:offset + length].splitlines())
+            self._chapters[key] = records
+        return records
+
+    def get(self, kind: str, record_id: str) -> Optional[dict]:
+        location = self.index[kind]["ids"].get(record_id)
+        if location is None:
+            return None
+        return self.chapter(kind, location[0])[location[1]]
+
+    def all(self, kind: str) -> tuple:
+        return tuple(record for chapter in self.chapters(kind) for record in self.chapter(kind, chapter))
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+
+def watched_paths(content_dir: Path) -> List[Path]:
+    """Files whose changes mean a new bank version: the sources and the built index"""
+    content_dir = Path(content_dir)
+    return [content_dir / name for name in SOURCE_FILES.values()] + [content_dir / BUILD_DIR / INDEX_FILE]
+
+
+def open_bank(content_dir: Path, chapters: Optional[set] = None) -> ContentBank:
+    """Open the built bank, rebuilding it first if the sources changed"""
+    content_dir = Path(content_dir)
+    if needs_build(content_dir):
+        build(content_dir, chapters)
+    return ContentBank(content_dir / BUILD_DIR)
+
+
+class LazyMapping(Mapping):
+    """Read-only mapping over known keys whose values are computed on first access"""
+
+    def __init__(self, keys, loader):
+        self._keys = tuple(keys)
+        self._key_set = frozenset(self._keys)
+        self._loader = loader
+        self._values = {}
+
+    def __getitem__(self, key):
+        if key not in self._key_set:
+            raise KeyError(key)
+        if key not in self._values:
+            self._values[key] = self._loader(key)
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class RecordView(Mapping):
+    """id -> record mapping backed by the bank index"""
+
+    def __init__(self, bank: ContentBank, kind: str):
+        self._bank = bank
+        self._kind = kind
+        self._ids = bank.ids(kind)
+
+    def __getitem__(self, record_id):
+        record = self._bank.get(self._kind, record_id)
+        if record is None:
+            raise KeyError(record_id)
+        return record
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+
+if __name__ == "__main__":
+    content_dir = Path(__file__).parent / "content"
+    try:
+        if "--check" in sys.argv[1:]:
+            errors = validate(load_sources(content_dir))
+            if errors:
+                raise ContentError(errors)
+            print("✓ Content is valid")
+        else:
+            index = build(content_dir)
+            counts = ", ".join(f"{len(index[kind]['ids'])} {kind}" for kind in KINDS)
+            print(f"✓ Built bank {index['version']}: {counts}")
+    except ContentError as e:
+        for error in e.errors:
+            print(f"✗ {error}")
+        sys.exit(1)
@@ -0,0 +1,54 @@
+"""
+Export quiz results or progress for reporting, straight from MongoDB.
+
+Usage:
+    python export_data.py [--collection quiz_results|progress] [--format ndjson|csv]
+                          [--since WATERMARK] [--output FILE]
+
+Rows are written in watermark order ((sync_ms, id), sync_ms being the time
+the server stored the attempt, for quiz results; (last_activity, user_id)
+for progress). The last watermark is printed to stderr; pass it as --since
+on the next run to export only newer rows, even if a run stopped in the
+middle of attempts stored by the same sync.
+"""
+import argparse
+import asyncio
+import sys
+
+import server
+
+
+async def main(args) -> int:
+    columns = server.EXPORTS[args.collection][3]
+    try:
+        since = server.parse_watermark(args.collection, args.since)
+    except ValueError:
+        print(f"Invalid watermark for {args.collection}: {args.since}", file=sys.stderr)
+        return 2
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    count = 0
+    watermark = args.since
+    try:
+        if args.format == "csv":
+            out.write(server.format_csv(None, columns))
+        async for row in server.export_rows(server.db, args.collection, since):
+            if args.format == "ndjson":
+                out.write(server.format_ndjson(row, columns))
+            else:
+                out.write(server.format_csv(row, columns))
+            watermark = server.format_watermark(args.collection, row)
+            count += 1
+    finally:
+        if args.output:
+            out.close()
+    print(f"Exported {count} rows, watermark: {watermark or '-'}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export quiz results or progress as NDJSON or CSV")
+    parser.add_argument("--collection", choices=sorted(server.EXPORTS), default="quiz_results")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--since", help="Only export rows after this watermark (\"<value>,<id>\")")
+    parser.add_argument("--output", help="Write to this file instead of stdout")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -1,16 +1,38 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, CursorType
+from pymongo.errors import CollectionInvalid, DuplicateKeyError, OperationFailure, PyMongoError
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from typing import List, Literal, Optional
 import uuid
-from datetime import datetime, timezone, timedelta
+import random
+from types import MappingProxyType
+from functools import cached_property
+from datetime import date, datetime, timezone, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import asyncio
+import base64
+import contextvars
+import csv
+import gzip
+import io
 import hashlib
+import heapq
+import hmac
+import json
+import time
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 import secrets
 import jwt
 import httpx
@@ -18,8 +40,12 @@ import httpx
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# Import extended questions
-from questions_extended import EXTENDED_QUESTIONS, EXTENDED_FLASHCARDS
+# Question bank (content/*.json, compiled to content/build/ on demand)
+from content_store import ContentError, LazyMapping, RecordView, open_bank, watched_paths
+
+CONTENT_DIR = ROOT_DIR / "content"
+# Seconds between checks for edited content files; 0 disables hot reload
+CONTENT_RELOAD_INTERVAL = float(os.environ.get('CONTENT_RELOAD_INTERVAL', '2'))
 
 # MongoDB connection
 mongo_url = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
@@ -27,12 +53,87 @@ db_name = os.environ.get("DB_NAME", "linux_xk0_006")
 client = AsyncIOMotorClient(mongo_url)
 db = client[db_name]
 
+# Worker processes; uvicorn and gunicorn start this many when no --workers option is
+# given. With more than one, in-process caches are kept coherent over the
+# cache_events collection. Workers cannot see a bare --workers option, so that
+# needs CACHE_BUS=true.
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', '1'))
+CACHE_BUS_ENABLED = os.environ.get('CACHE_BUS', 'true' if WEB_CONCURRENCY > 1 else 'false').lower() in ('1', 'true', 'yes')
+CACHE_BUS_SIZE = int(os.environ.get('CACHE_BUS_SIZE', str(1024 * 1024)))
+
 # JWT Secret
-JWT_SECRET = os.environ.get('JWT_SECRET', secrets.token_hex(32))
+JWT_SECRET = os.environ.get('JWT_SECRET')
+if not JWT_SECRET:
+    if WEB_CONCURRENCY > 1:
+        # A random secret per process would reject tokens issued by the other workers
+        raise RuntimeError("JWT_SECRET must be set when running more than one worker")
+    JWT_SECRET = secrets.token_hex(32)
 JWT_ALGORITHM = "HS256"
 
+# Password hashing (scrypt). Cost parameters only apply to newly written hashes;
+# existing hashes with other parameters are upgraded on the next login.
+PASSWORD_SCRYPT_N = int(os.environ.get('PASSWORD_SCRYPT_N', str(2 ** 14)))
+PASSWORD_SCRYPT_R = int(os.environ.get('PASSWORD_SCRYPT_R', '8'))
+PASSWORD_SCRYPT_P = int(os.environ.get('PASSWORD_SCRYPT_P', '1'))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', '64'))
+
+# In-process caches for decoded tokens and user documents
+AUTH_CACHE_TTL = float(os.environ.get('AUTH_CACHE_TTL', '60'))
+AUTH_CACHE_SIZE = int(os.environ.get('AUTH_CACHE_SIZE', '10000'))
+
+# Cache for AI explanations (in-process LRU plus the ai_explanations collection)
+AI_CACHE_ENABLED = os.environ.get('AI_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+AI_CACHE_TTL = int(os.environ.get('AI_CACHE_TTL', str(30 * 24 * 3600)))
+AI_CACHE_SIZE = int(os.environ.get('AI_CACHE_SIZE', '2000'))
+
+# Exam simulation, matching the CompTIA format (720/900 to pass)
+EXAM_QUESTION_COUNT = int(os.environ.get('EXAM_QUESTION_COUNT', '60'))
+EXAM_DURATION_MINUTES = int(os.environ.get('EXAM_DURATION_MINUTES', '90'))
+EXAM_GRACE_SECONDS = int(os.environ.get('EXAM_GRACE_SECONDS', '30'))
+EXAM_PASSING_PERCENTAGE = 720 / 900 * 100
+
+# Bulk export for reporting; the endpoint is disabled unless ADMIN_TOKEN is set
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+
+# Fail startup if a hot query would scan a whole collection
+CHECK_QUERY_PLANS = os.environ.get('CHECK_QUERY_PLANS', '').lower() in ('1', 'true', 'yes')
+
+# Client cache lifetime for the static catalog endpoints (chapters, study plan, ...)
+STATIC_CACHE_MAX_AGE = int(os.environ.get('STATIC_CACHE_MAX_AGE', '300'))
+# Response compression: brotli when the brotli package is installed, else gzip.
+# Levels for dynamic responses trade ratio for speed; static variants are built
+# once at the highest level.
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))
+COMPRESSION_LEVELS = {"br": int(os.environ.get('BROTLI_QUALITY', '4')), "gzip": int(os.environ.get('GZIP_LEVEL', '6'))}
+STATIC_COMPRESSION_LEVELS = {"br": 11, "gzip": 9}
+
+try:
+    import brotli  # optional, enables Content-Encoding: br
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+COMPRESSION_ENCODINGS = ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+
+# Compact binary bodies for clients sending Accept: application/msgpack
+try:
+    import msgpack  # optional
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# orjson encodes the large lists (questions, flashcards, history) several times
+# faster than the stdlib; without it responses fall back to json
+try:
+    import orjson  # noqa: F401 -- used by ORJSONResponse
+    from fastapi.responses import ORJSONResponse as JSON_RESPONSE_CLASS
+except ImportError:
+    JSON_RESPONSE_CLASS = JSONResponse
+
 # Create the main app
-app = FastAPI()
+app = FastAPI(default_response_class=JSON_RESPONSE_CLASS)
 api_router = APIRouter(prefix="/api")
 security = HTTPBearer(auto_error=False)
 
@@ -90,6 +191,33 @@ class UserProgress(BaseModel):
     streak_days: int = 0
     last_activity: str = ""
     flashcards_reviewed: int = 0
+    chapter_stats: dict = {}
+
+class QuizAnswerResult(BaseModel):
+    question_id: str
+    selected: int
+    is_correct: bool
+    correct: Optional[int] = None
+    explanation: Optional[str] = None
+
+class QuizSubmitResponse(BaseModel):
+    id: str
+    score: int
+    total: int
+    percentage: float
+    results: List[QuizAnswerResult]
+
+class QuizSummary(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    chapter: int
+    score: int
+    total: int
+    percentage: float
+    completed_at: str
+
+class ProgressResponse(UserProgress):
+    quiz_history: List[QuizSummary] = []
 
 class Flashcard(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -107,8 +235,90 @@ class StudyPlanWeek(BaseModel):
 
 # ============ HELPERS ============
 
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+def trusted_response(content) -> Response:
+    """Serialize data the server built itself (bank records, its own documents).
+
+    Returning a Response skips FastAPI's jsonable_encoder pass and the
+    response_model validation; the route's response_model still documents
+    the shape in OpenAPI.
+    """
+    return JSON_RESPONSE_CLASS(content)
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=32)
+
+def _hash_password_sync(password: str) -> str:
+    salt = secrets.token_bytes(16)
+    digest = _scrypt(password, salt, PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+    return f"scrypt${PASSWORD_SCRYPT_N}${PASSWORD_SCRYPT_R}${PASSWORD_SCRYPT_P}${salt.hex()}${digest.hex()}"
+
+def _verify_password_sync(password: str, stored: str) -> tuple:
+    """Return (matches, needs_rehash) for a stored scrypt or legacy SHA-256 hash."""
+    if not stored.startswith("scrypt$"):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, stored), True
+    _, n, r, p, salt, digest = stored.split("$")
+    n, r, p = int(n), int(r), int(p)
+    matches = hmac.compare_digest(_scrypt(password, bytes.fromhex(salt), n, r, p).hex(), digest)
+    outdated = (n, r, p) != (PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+    return matches, outdated
+
+class PasswordHasher:
+    """Runs scrypt on a small dedicated thread pool.
+
+    hashlib releases the GIL while hashing, so the event loop keeps serving
+    other requests. The number of queued jobs is capped; beyond that callers
+    get a 503 instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._dummy_hash = None
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash_password_sync, password)
+
+    async def verify(self, password: str, stored: str) -> tuple:
+        return await self._run(_verify_password_sync, password, stored)
+
+    async def dummy_hash(self) -> str:
+        """A hash with the current parameters, to verify against when a user does not exist"""
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash(secrets.token_urlsafe(16))
+        return self._dummy_hash
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "peak_pending": self.peak_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+PASSWORD_HASHER = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
 
 def create_token(user_id: str) -> str:
     payload = {
@@ -117,16 +327,481 @@ def create_token(user_id: str) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag == etag or tag == f"W/{etag}" for tag in candidates)
+
+def _parse_accept(header: Optional[str]) -> dict:
+    """Accept / Accept-Encoding header as {token: q}"""
+    accepted = {}
+    for item in (header or "").split(","):
+        token, *params = [part.strip() for part in item.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[token.lower()] = q
+    return accepted
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best content coding we can produce: br (if available), then gzip"""
+    accepted = _parse_accept(accept_encoding)
+    wildcard = accepted.get("*", 0)
+    best = None
+    for encoding in COMPRESSION_ENCODINGS:
+        q = accepted.get(encoding, wildcard)
+        if q > 0 and (best is None or q > best[1]):
+            best = (encoding, q)
+    return best[0] if best else None
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    if not MSGPACK_AVAILABLE:
+        return False
+    accepted = _parse_accept(accept)
+    return any(accepted.get(media_type, 0) > 0 for media_type in MSGPACK_MEDIA_TYPES)
+
+def compress_body(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_LEVELS["br"] if level is None else level)
+    return gzip.compress(body, compresslevel=COMPRESSION_LEVELS["gzip"] if level is None else level, mtime=0)
+
+class StreamCompressor:
+    """Incremental gzip/brotli that flushes after every chunk, so streamed responses stay streamed"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=COMPRESSION_LEVELS["br"])
+        else:
+            # wbits 31 = zlib deflate with a gzip header and trailer
+            self._zlib = zlib.compressobj(COMPRESSION_LEVELS["gzip"], zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + (self._brotli.finish() if final else self._brotli.flush())
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class StaticResponse:
+    """JSON body serialized once, served with a strong ETag.
+
+    Used for endpoints that return module-level constants so they are not
+    re-validated and re-encoded on every request. Every representation
+    (msgpack and/or compressed) is built on first use, kept, and gets its own
+    ETag. Accepts already serialized JSON bytes as well.
+    """
+
+    def __init__(self, content):
+        if isinstance(content, bytes):
+            self.body = content
+        else:
+            self.body = json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self._variants = {(False, None): (self.body, self.etag, None)}
+
+    def variant(self, binary: bool, encoding: Optional[str]) -> tuple:
+        """(body, etag, applied encoding) for a media type and content coding"""
+        key = (binary, encoding)
+        if key not in self._variants:
+            body = msgpack.packb(json.loads(self.body)) if binary else self.body
+            suffix = "-msgpack" if binary else ""
+            if encoding and len(body) >= COMPRESS_MIN_SIZE:
+                # Built once, so spend the highest compression level on it
+                body = compress_body(body, encoding, STATIC_COMPRESSION_LEVELS[encoding])
+                suffix += f"-{encoding}"
+            else:
+                encoding = None
+            self._variants[key] = (body, f'{self.etag[:-1]}{suffix}"' if suffix else self.etag, encoding)
+        return self._variants[key]
+
+    def respond(self, request: Request) -> Response:
+        binary = wants_msgpack(request.headers.get("accept"))
+        body, etag, encoding = self.variant(binary, negotiate_encoding(request.headers.get("accept-encoding")))
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={STATIC_CACHE_MAX_AGE}", "Vary": "Accept, Accept-Encoding"}
+        # Every variant holds the same content, so a cached copy in any of them is fresh
+        if_none_match = request.headers.get("if-none-match")
+        if any(_etag_matches(if_none_match, tag) for _, tag, _ in self._variants.values()):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=MSGPACK_MEDIA_TYPES[0] if binary else "application/json", headers=headers)
+
+class CompressionMiddleware:
+    """Negotiated response compression and opt-in msgpack bodies.
+
+    Responses that already carry a Content-Encoding (the precompressed static
+    variants) and server-sent events pass through untouched. Complete bodies
+    below COMPRESS_MIN_SIZE are sent as they are; streamed bodies are
+    compressed chunk by chunk. Only complete JSON bodies are converted to
+    msgpack.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding"))
+        binary = wants_msgpack(request_headers.get("accept"))
+        if encoding is None and not binary:
+            return await self.app(scope, receive, send)
+        
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_encoded(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to encode
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                body = compressor.compress(message.get("body", b""), final=not more_body)
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+            
+            headers = MutableHeaders(raw=list(start["headers"]))
+            body = message.get("body", b"")
+            media_type = headers.get("content-type", "").split(";")[0].strip()
+            if "content-encoding" in headers or media_type == "text/event-stream" or start["status"] in (204, 304):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            if binary and media_type == "application/json" and not more_body:
+                body = msgpack.packb(json.loads(body))
+                headers["content-type"] = MSGPACK_MEDIA_TYPES[0]
+                headers.add_vary_header("Accept")
+            if encoding and (more_body or len(body) >= COMPRESS_MIN_SIZE):
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    compressor = StreamCompressor(encoding)
+                    body = compressor.compress(body, final=False)
+                else:
+                    body = compress_body(body, encoding)
+            if more_body:
+                if "content-length" in headers:
+                    del headers["content-length"]
+            else:
+                headers["content-length"] = str(len(body))
+            passthrough = compressor is None
+            start["headers"] = headers.raw
+            await send(start)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_encoded)
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after a TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + (self.ttl if ttl is None else min(ttl, self.ttl))
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+TOKEN_CACHE = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+USER_CACHE = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+
+# ============ CACHE BUS ============
+
+class CacheBus:
+    """Cross-worker cache invalidation over a capped MongoDB collection.
+
+    Every worker appends invalidation events to cache_events and tails the
+    collection with an awaitable cursor, applying events from the other
+    workers to its own caches. Handlers take the invalidated key, or None
+    after the bus lost events (e.g. while MongoDB was unreachable) and the
+    whole cache has to be dropped.
+    """
+
+    # Events slightly older than the last one seen are replayed when the cursor
+    # is reopened; invalidations are idempotent, missed ones are not
+    REPLAY_WINDOW = timedelta(seconds=5)
+
+    def __init__(self, enabled: bool, size: int):
+        self.enabled = enabled
+        self.size = size
+        self.worker_id = uuid.uuid4().hex
+        self.handlers = {}
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    def on(self, kind: str, handler):
+        self.handlers[kind] = handler
+
+    async def publish(self, kind: str, key: Optional[str] = None):
+        if not self.enabled:
+            return
+        try:
+            await db.cache_events.insert_one(
+                {"worker": self.worker_id, "kind": kind, "key": key, "at": datetime.now(timezone.utc)}
+            )
+            self.published += 1
+        except PyMongoError as e:
+            # Peers fall back to their cache TTLs for this entry
+            self.errors += 1
+            logger.warning(f"Cache bus publish failed: {e}")
+
+    async def _apply(self, kind: str, key: Optional[str]):
+        handler = self.handlers.get(kind)
+        if handler is None:
+            return
+        try:
+            result = handler(key)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            # A failing handler must not end the listener, or this worker
+            # stops receiving invalidations altogether
+            self.errors += 1
+            logger.exception(f"Cache bus handler for {kind} failed: {e}")
+
+    async def listen(self):
+        since = datetime.now(timezone.utc)
+        # Events applied within the replay window, so a reopened cursor skips them
+        seen = {}
+        lost_events = False
+        while True:
+            try:
+                try:
+                    await db.create_collection("cache_events", capped=True, size=self.size)
+                except CollectionInvalid:
+                    pass
+                if lost_events:
+                    for kind in self.handlers:
+                        await self._apply(kind, None)
+                    lost_events = False
+                seen = {event_id: at for event_id, at in seen.items() if at >= since - self.REPLAY_WINDOW}
+                cursor = db.cache_events.find(
+                    {"at": {"$gte": since - self.REPLAY_WINDOW}}, cursor_type=CursorType.TAILABLE_AWAIT
+                )
+                # An awaited getMore that finds nothing ends the async for, but the
+                # cursor stays open; keep reading from it until it dies
+                while cursor.alive:
+                    async for event in cursor:
+                        at = event["at"].replace(tzinfo=timezone.utc)
+                        since = max(since, at)
+                        if event["_id"] in seen:
+                            continue
+                        seen[event["_id"]] = at
+                        if event["worker"] != self.worker_id:
+                            self.received += 1
+                            await self._apply(event["kind"], event.get("key"))
+                # A tailable cursor dies on an empty collection; reopen after a pause
+                await asyncio.sleep(1)
+            except PyMongoError as e:
+                self.errors += 1
+                lost_events = True
+                logger.warning(f"Cache bus disconnected, retrying: {e}")
+                await asyncio.sleep(5)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "worker_id": self.worker_id,
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors,
+        }
+
+CACHE_BUS = CacheBus(CACHE_BUS_ENABLED, CACHE_BUS_SIZE)
+
+async def invalidate_user(user_id: str):
+    USER_CACHE.invalidate(user_id)
+    await CACHE_BUS.publish("user", user_id)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     if not credentials:
         return None
+    token = credentials.credentials
     try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user = await db.users.find_one({"id": payload["user_id"]}, {"_id": 0})
+        payload = TOKEN_CACHE.get(token)
+        if payload is None:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+            # Never serve a cached token past its own expiry
+            TOKEN_CACHE.set(token, payload, ttl=payload["exp"] - time.time())
+        user = USER_CACHE.get(payload["user_id"])
+        if user is None:
+            user = await db.users.find_one({"id": payload["user_id"]}, {"_id": 0, "password": 0})
+            if user:
+                USER_CACHE.set(user["id"], user)
         return user
     except Exception:
         return None
 
+# ============ DATABASE INDEXES ============
+
+# (collection, keys, options) for every index the routes rely on
+INDEXES = [
+    ("users", [("id", ASCENDING)], {"unique": True}),
+    ("users", [("email", ASCENDING)], {"unique": True}),
+    ("progress", [("user_id", ASCENDING)], {"unique": True}),
+    ("quiz_results", [("id", ASCENDING)], {"unique": True}),
+    ("quiz_results", [("user_id", ASCENDING), ("completed_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("quiz_results", [("user_id", ASCENDING), ("chapter", ASCENDING), ("completed_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("quiz_results", [("sync_ms", ASCENDING), ("id", ASCENDING)], {}),
+    ("quiz_results", [("user_id", ASCENDING), ("client_id", ASCENDING)],
+     {"unique": True, "partialFilterExpression": {"client_id": {"$exists": True}}}),
+    ("quiz_results", [("user_id", ASCENDING), ("sync_ms", ASCENDING), ("id", ASCENDING)], {}),
+    ("progress", [("last_activity", ASCENDING), ("user_id", ASCENDING)], {}),
+    ("sr_states", [("user_id", ASCENDING)], {"unique": True}),
+    ("exam_sessions", [("id", ASCENDING)], {"unique": True}),
+    ("question_stats", [("user_id", ASCENDING)], {"unique": True}),
+    ("ai_explanations", [("key", ASCENDING)], {"unique": True}),
+    ("ai_explanations", [("created_at", ASCENDING)], {"expireAfterSeconds": AI_CACHE_TTL}),
+]
+
+# (collection, filter, sort) shapes of the queries on the request path
+HOT_QUERIES = [
+    ("users", {"id": "x"}, None),
+    ("users", {"email": "x"}, None),
+    ("progress", {"user_id": "x"}, None),
+    ("quiz_results", {"user_id": "x"}, [("completed_at", DESCENDING)]),
+    ("quiz_results", {"user_id": "x"}, [("completed_at", DESCENDING), ("id", DESCENDING)]),
+    ("quiz_results", {"user_id": "x", "chapter": 1}, [("completed_at", DESCENDING), ("id", DESCENDING)]),
+    ("quiz_results", {"sync_ms": "x"}, [("sync_ms", ASCENDING), ("id", ASCENDING)]),
+    ("quiz_results", {"user_id": "x", "client_id": "x"}, None),
+    ("quiz_results", {"user_id": "x", "sync_ms": "x"}, [("sync_ms", ASCENDING), ("id", ASCENDING)]),
+    ("progress", {"last_activity": "x"}, [("last_activity", ASCENDING), ("user_id", ASCENDING)]),
+    ("sr_states", {"user_id": "x"}, None),
+    ("exam_sessions", {"id": "x", "user_id": "x"}, None),
+    ("question_stats", {"user_id": "x"}, None),
+    ("ai_explanations", {"key": "x"}, None),
+]
+
+async def ensure_indexes(database) -> List[str]:
+    """Create or update every index in INDEXES; returns the ones that failed.
+
+    An index the server rejects (e.g. a conflicting existing index, or a unique
+    index over duplicates) is logged and skipped so the others are still built.
+    Connection errors are raised.
+    """
+    failures = []
+    for collection, keys, options in INDEXES:
+        try:
+            if "expireAfterSeconds" in options and await _update_ttl(database, collection, keys, options["expireAfterSeconds"]):
+                continue
+            await database[collection].create_index(keys, **options)
+        except OperationFailure as e:
+            failures.append(f"{collection} {dict(keys)}: {e}")
+            logger.error(f"Could not create index {collection} {dict(keys)}: {e}")
+    return failures
+
+async def _update_ttl(database, collection: str, keys: List[tuple], ttl: int) -> bool:
+    """Apply a changed TTL to an existing index with collMod; False if there is no such index.
+
+    create_index with a different expireAfterSeconds fails with an options
+    conflict and would leave the old TTL in place.
+    """
+    for info in (await database[collection].index_information()).values():
+        if list(info["key"]) != list(keys):
+            continue
+        if info.get("expireAfterSeconds") != ttl:
+            await database.command("collMod", collection, index={"keyPattern": dict(keys), "expireAfterSeconds": ttl})
+            logger.info(f"Changed TTL of {collection} {dict(keys)} to {ttl}s")
+        return True
+    return False
+
+def _plan_stages(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+def _index_covers(index_keys: List[tuple], filter_doc: dict, sort) -> bool:
+    # Leading index fields must be equality fields of the filter, followed by the sort fields
+    fields = [field for field, _ in index_keys]
+    prefix = 0
+    while prefix < len(fields) and fields[prefix] in filter_doc:
+        prefix += 1
+    sort_fields = [field for field, _ in (sort or []) if field not in fields[:prefix]]
+    return prefix > 0 and fields[prefix:prefix + len(sort_fields)] == sort_fields
+
+async def check_query_plans(database) -> List[str]:
+    """Return a description of every hot query that would run as a COLLSCAN.
+
+    Uses explain() where the driver supports it. mongomock has no query
+    planner, so there we fall back to checking that an index prefix matches
+    the query's filter and sort fields.
+    """
+    problems = []
+    for collection, filter_doc, sort in HOT_QUERIES:
+        cursor = database[collection].find(filter_doc)
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            explain = await cursor.explain()
+        except (AttributeError, NotImplementedError):
+            indexes = await database[collection].index_information()
+            if not any(_index_covers(info["key"], filter_doc, sort) for info in indexes.values()):
+                problems.append(f"{collection} {filter_doc} sort={sort}: no matching index")
+            continue
+        if "COLLSCAN" in _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {})):
+            problems.append(f"{collection} {filter_doc} sort={sort}: COLLSCAN")
+    return problems
+
 # ============ AUTH ROUTES ============
 
 @api_router.post("/auth/register")
@@ -139,12 +814,17 @@ async def register(data: UserCreate):
     user = {
         "id": user_id,
         "email": data.email,
-        "password": hash_password(data.password),
+        "password": await PASSWORD_HASHER.hash(data.password),
         "name": data.name,
         "created_at": datetime.now(timezone.utc).isoformat(),
         "language": "en"
     }
-    await db.users.insert_one(user)
+    try:
+        await db.users.insert_one(user)
+    except DuplicateKeyError:
+        # A concurrent registration with the same email got there first
+        raise HTTPException(status_code=400, detail="Email already registered")
+    await invalidate_user(user_id)
     
     # Initialize progress
     progress = {
@@ -156,7 +836,8 @@ async def register(data: UserCreate):
         "current_week": 1,
         "streak_days": 0,
         "last_activity": datetime.now(timezone.utc).isoformat(),
-        "flashcards_reviewed": 0
+        "flashcards_reviewed": 0,
+        "chapter_stats": {}
     }
     await db.progress.insert_one(progress)
     
@@ -165,9 +846,18 @@ async def register(data: UserCreate):
 
 @api_router.post("/auth/login")
 async def login(data: UserLogin):
-    user = await db.users.find_one({"email": data.email, "password": hash_password(data.password)}, {"_id": 0})
+    user = await db.users.find_one({"email": data.email}, {"_id": 0})
     if not user:
+        # Spend the same scrypt time as for a wrong password, so response times
+        # don't reveal which emails are registered
+        await PASSWORD_HASHER.verify(data.password, await PASSWORD_HASHER.dummy_hash())
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    matches, needs_rehash = await PASSWORD_HASHER.verify(data.password, user.get("password", ""))
+    if not matches:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if needs_rehash:
+        new_hash = await PASSWORD_HASHER.hash(data.password)
+        await db.users.update_one({"id": user["id"]}, {"$set": {"password": new_hash}})
     
     token = create_token(user["id"])
     return {"token": token, "user": {"id": user["id"], "email": user["email"], "name": user["name"], "language": user.get("language", "en")}}
@@ -176,122 +866,28 @@ async def login(data: UserLogin):
 async def get_me(user = Depends(get_current_user)):
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    return {"id": user["id"], "email": user["email"], "name": user["name"], "language": user.get("language", "en")}
+    return {"id": user["id"], "email": user["email"], "name": user["name"], "language": user.get("language", "en"), "timezone": user.get("timezone", "UTC")}
 
 @api_router.put("/auth/language")
 async def update_language(language: str, user = Depends(get_current_user)):
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     await db.users.update_one({"id": user["id"]}, {"$set": {"language": language}})
+    await invalidate_user(user["id"])
     return {"success": True, "language": language}
 
-# ============ QUESTIONS DATA ============
-
-QUESTIONS = [
-    # Chapter 1: Linux System Foundations
-    {"id": "q1", "chapter": 1, "question": "A newly provisioned physical server fails to boot past the BIOS screen. You notice the bootloader menu never appears. Which component is most likely misconfigured?", "options": ["EFI System Partition", "Initramfs image", "Kernel command line", "/etc/fstab entry"], "correct_answer": 0, "explanation": "The EFI System Partition contains the bootloader. If it's misconfigured, the system won't be able to load GRUB or any bootloader."},
-    {"id": "q2", "chapter": 1, "question": "While troubleshooting a GRUB2 boot entry, you need to add a kernel parameter to disable SELinux at startup. Which file should you edit?", "options": ["/boot/grub2/grub.cfg", "/etc/default/grub", "/etc/grub.d/40_custom", "/etc/sysconfig/kernel"], "correct_answer": 1, "explanation": "/etc/default/grub is the correct file for persistent GRUB configuration changes."},
-    {"id": "q3", "chapter": 1, "question": "A system's initramfs lacks the driver for its storage controller, causing a panic during early boot. Which tool regenerates initramfs with correct modules?", "options": ["mkinitcpio", "depmod", "update-grub", "dracut"], "correct_answer": 3, "explanation": "dracut is the standard tool for regenerating initramfs on RHEL-based systems."},
-    {"id": "q4", "chapter": 1, "question": "You need to inspect currently loaded kernel modules and their memory footprint. Which command provides this information?", "options": ["lsmod", "modinfo", "modprobe -l", "insmod"], "correct_answer": 0, "explanation": "lsmod lists all currently loaded kernel modules with their size and dependencies."},
-    {"id": "q5", "chapter": 1, "question": "A log indicates a kernel panic due to missing root filesystem. Which boot parameter would correctly identify the root device?", "options": ["fstab=/etc/fstab", "init=/sbin/init", "root=/dev/sda1", "quiet"], "correct_answer": 2, "explanation": "The root= parameter specifies the root filesystem device."},
-    {"id": "q6", "chapter": 1, "question": "An administrator must create a logical volume that spans two 1 TB disks. After initializing both disks with pvcreate, which command combines them into a single pool?", "options": ["vgextend", "vgcreate", "pvscan", "lvs"], "correct_answer": 1, "explanation": "vgcreate creates a new volume group from physical volumes."},
-    {"id": "q7", "chapter": 1, "question": "During a live migration of a virtual machine, network connectivity drops intermittently. Which virtualization component is most likely involved?", "options": ["QEMU network bridge", "KVM CPU scheduler", "libvirt storage pool", "KVM balloon driver"], "correct_answer": 0, "explanation": "Network issues during VM migration typically involve the QEMU network bridge configuration."},
-    {"id": "q8", "chapter": 1, "question": "A newly created logical volume must be formatted with XFS and mounted at /data. What sequence of commands achieves this?", "options": ["mkfs.xfs /dev/vg01/data; mount /data", "mkfs.ext4 /dev/vg01/data; mount /dev/vg01/data /data", "mkfs.xfs /dev/mapper/vg01-data; mount /dev/mapper/vg01-data /data", "mke2fs -t xfs /dev/vg01-data; mount /data"], "correct_answer": 2, "explanation": "The /dev/mapper path is the correct device mapper path for LVM volumes."},
-    {"id": "q9", "chapter": 1, "question": "A configuration management script must append 'export JAVA_HOME' to all user shells. Which file is best for a system-wide environment variable?", "options": ["/etc/profile.d/java.sh", "~/.bash_profile", "/etc/environment", "/etc/bashrc"], "correct_answer": 0, "explanation": "/etc/profile.d/ is the recommended location for system-wide shell environment scripts."},
-    {"id": "q10", "chapter": 1, "question": "After editing /etc/netplan/01-netcfg.yaml, commands hang with no error. Which step is missing?", "options": ["netplan generate", "netplan apply", "ifup eth0", "systemctl restart networking"], "correct_answer": 1, "explanation": "netplan apply activates the new network configuration."},
-    
-    # Chapter 2: Services, User Management, Containerization
-    {"id": "q11", "chapter": 2, "question": "A development team needs to share files in /opt/shared with specific access requirements. Members of the devteam group require read/write access, while managers group needs read-only access. Which command implements this using ACLs?", "options": ["setfacl -m g:devteam:rw,g:managers:r /opt/shared", "setfacl -m g:devteam:rwx,g:managers:r-x /opt/shared", "chmod g+rw,o+r /opt/shared", "chgrp devteam /opt/shared && chmod 764 /opt/shared"], "correct_answer": 0, "explanation": "setfacl with -m modifies ACLs to set different permissions for different groups."},
-    {"id": "q12", "chapter": 2, "question": "After creating a new user account with 'useradd -m alice', the user reports they cannot log in. Which file most likely needs modification?", "options": ["/etc/shadow", "/etc/passwd", "/etc/group", "/etc/login.defs"], "correct_answer": 0, "explanation": "The password needs to be set in /etc/shadow using passwd command."},
-    {"id": "q13", "chapter": 2, "question": "A system administrator must ensure all files created in /data/projects inherit the group ownership of the directory. Which permission bit achieves this?", "options": ["Sticky bit (chmod +t)", "SUID bit (chmod +s on user)", "SGID bit (chmod +s on group)", "Execute bit (chmod +x)"], "correct_answer": 2, "explanation": "The SGID bit on a directory causes new files to inherit the directory's group."},
-    {"id": "q14", "chapter": 2, "question": "A containerized web application requires persistent storage for uploaded files. Which Podman command creates a named volume and mounts it to /app/uploads?", "options": ["podman run -v uploads:/app/uploads webapp:latest", "podman volume create uploads && podman run --mount source=uploads,target=/app/uploads webapp:latest", "Both A and B", "podman run --tmpfs /app/uploads webapp:latest"], "correct_answer": 2, "explanation": "Both syntaxes are valid for creating and mounting named volumes in Podman."},
-    {"id": "q15", "chapter": 2, "question": "Users report slow system performance. Analysis shows process PID 1234 has a nice value of -10. What does this indicate?", "options": ["The process has lower than normal priority", "The process has higher than normal priority", "The process is suspended", "The process has standard priority"], "correct_answer": 1, "explanation": "Negative nice values indicate higher priority. -10 means the process gets more CPU time."},
-    {"id": "q16", "chapter": 2, "question": "A service fails to start automatically after system reboot. Which systemctl command configures it for automatic startup?", "options": ["systemctl start servicename", "systemctl enable servicename", "systemctl reload servicename", "systemctl restart servicename"], "correct_answer": 1, "explanation": "systemctl enable creates symlinks to start the service at boot."},
-    {"id": "q17", "chapter": 2, "question": "You must remove user account 'tempuser' while preserving their home directory for audit purposes. Which command achieves this?", "options": ["userdel tempuser", "userdel -r tempuser", "userdel --remove-home tempuser", "usermod -L tempuser"], "correct_answer": 0, "explanation": "userdel without -r removes the user but preserves the home directory."},
-    {"id": "q18", "chapter": 2, "question": "A Docker container needs to communicate with a database container on the same host. Which networking approach is most appropriate?", "options": ["Host networking mode", "Bridge networking with custom network", "Container networking mode", "Macvlan networking"], "correct_answer": 1, "explanation": "Custom bridge networks allow containers to communicate using container names as DNS."},
-    {"id": "q19", "chapter": 2, "question": "An application requires execution with elevated privileges but should not run as root. Which file attribute enables this safely?", "options": ["Setting SUID bit on the executable", "Adding the user to sudo group", "Using capabilities with setcap", "Creating a dedicated service account"], "correct_answer": 2, "explanation": "Linux capabilities provide fine-grained privilege control without full root access."},
-    {"id": "q20", "chapter": 2, "question": "Package installation fails with dependency conflicts. Which YUM/DNF option forces installation despite dependency issues?", "options": ["--nodeps", "--force", "--skip-broken", "--override"], "correct_answer": 2, "explanation": "--skip-broken allows installation to continue skipping problematic packages."},
-    
-    # Chapter 3: Security Hardening
-    {"id": "q21", "chapter": 3, "question": "A system administrator needs to configure PAM to require both password and smart card authentication for SSH access. Which PAM control flag ensures both methods must succeed?", "options": ["required", "sufficient", "requisite", "optional"], "correct_answer": 2, "explanation": "requisite means the module must succeed, and failure terminates authentication immediately."},
-    {"id": "q22", "chapter": 3, "question": "An organization implements LDAP authentication but users report login failures during network outages. Which PAM module configuration provides offline authentication capability?", "options": ["Configure pam_ldap with caching enabled", "Add pam_unix as a fallback after pam_ldap", "Use pam_sss with SSSD offline authentication", "All of the above"], "correct_answer": 2, "explanation": "SSSD with pam_sss provides robust offline authentication caching."},
-    {"id": "q23", "chapter": 3, "question": "An iptables rule needs to block incoming connections except SSH from management network 192.168.100.0/24. Which rule implements this policy?", "options": ["iptables -A INPUT -p tcp --dport 22 -j ACCEPT", "iptables -A INPUT -p tcp --dport 22 -j DROP", "iptables -P INPUT DROP; iptables -A INPUT -s 192.168.100.0/24 -p tcp --dport 22 -j ACCEPT", "iptables -A INPUT -m state --state ESTABLISHED -j ACCEPT"], "correct_answer": 2, "explanation": "Set default policy to DROP, then allow SSH only from the management network."},
-    {"id": "q24", "chapter": 3, "question": "A server requires connection rate limiting to prevent brute force attacks. Which iptables module provides this functionality?", "options": ["recent", "limit", "conntrack", "Both A and B"], "correct_answer": 3, "explanation": "Both 'recent' and 'limit' modules can be used for rate limiting in iptables."},
-    {"id": "q25", "chapter": 3, "question": "A system requires key-based SSH authentication with password authentication disabled. Which sshd_config settings implement this?", "options": ["PasswordAuthentication no", "PubkeyAuthentication yes", "AuthenticationMethods publickey", "All of the above"], "correct_answer": 3, "explanation": "All three settings together ensure only key-based authentication is allowed."},
-    {"id": "q26", "chapter": 3, "question": "Password policy requires 14-character minimum with complexity requirements. Which PAM module configuration enforces this?", "options": ["password requisite pam_pwquality.so minlen=14 ucredit=-1 lcredit=-1 dcredit=-1", "password required pam_cracklib.so minlen=14 difok=3", "password sufficient pam_unix.so minlen=14", "Both A and B"], "correct_answer": 0, "explanation": "pam_pwquality with minlen and credit options enforces password complexity."},
-    {"id": "q27", "chapter": 3, "question": "An account requires a restricted shell preventing access to system commands. Which shell provides this functionality?", "options": ["/bin/rbash", "/bin/false", "/sbin/nologin", "/usr/bin/scponly"], "correct_answer": 2, "explanation": "/sbin/nologin prevents login while displaying a message."},
-    {"id": "q28", "chapter": 3, "question": "Password aging policy requires users to change passwords every 90 days with 7-day warning. Which command implements this?", "options": ["chage -M 90 -W 7 username", "passwd -x 90 -w 7 username", "Both A and B", "usermod --maxdays 90 --warndays 7 username"], "correct_answer": 2, "explanation": "Both chage and passwd can configure password aging policies."},
-    {"id": "q29", "chapter": 3, "question": "SELinux is preventing a web application from accessing database files. Which command identifies the required policy changes?", "options": ["audit2allow -a", "sealert -a /var/log/audit/audit.log", "grep AVC /var/log/audit/audit.log", "All help diagnose SELinux denials"], "correct_answer": 1, "explanation": "sealert provides the most comprehensive analysis of SELinux denials."},
-    {"id": "q30", "chapter": 3, "question": "AppArmor profile development requires learning mode to observe application behavior. Which command enables learning mode for a profile?", "options": ["aa-complain /path/to/profile", "aa-enforce /path/to/profile", "aa-audit /path/to/profile", "aa-disable /path/to/profile"], "correct_answer": 0, "explanation": "aa-complain puts a profile in complain (learning) mode."},
-    
-    # Chapter 4: Automation, Scripting, DevOps
-    {"id": "q31", "chapter": 4, "question": "A DevOps team needs to automate the deployment of a web application across multiple servers. Which Ansible approach provides the most scalable solution?", "options": ["Run individual Ansible commands on each server", "Create a playbook with roles for web server configuration", "Use ad-hoc commands with loops", "Write shell scripts that call Ansible modules"], "correct_answer": 1, "explanation": "Ansible playbooks with roles provide the most maintainable and scalable automation."},
-    {"id": "q32", "chapter": 4, "question": "Your organization requires Infrastructure as Code for consistent environment provisioning. Which combination provides the most comprehensive solution?", "options": ["Terraform for provisioning, Ansible for configuration", "OpenTofu for provisioning, Puppet for configuration", "CloudFormation for provisioning, Chef for configuration", "All of the above depending on cloud provider"], "correct_answer": 0, "explanation": "Terraform + Ansible is a widely adopted combination for IaC."},
-    {"id": "q33", "chapter": 4, "question": "A shell script needs to handle errors gracefully and continue processing other tasks when one fails. Which construct accomplishes this?", "options": ["set -e at the beginning of the script", "Use trap to catch errors and continue", "Implement if-then checks after each command", "Use || true after potentially failing commands"], "correct_answer": 2, "explanation": "if-then checks provide the most control over error handling per command."},
-    {"id": "q34", "chapter": 4, "question": "You need to create a Python virtual environment for a system administration project. Which command sequence is correct?", "options": ["python3 -m venv myproject && source myproject/bin/activate", "virtualenv myproject && . myproject/bin/activate", "Both A and B are correct", "pip install venv && venv activate myproject"], "correct_answer": 0, "explanation": "python3 -m venv is the standard way to create virtual environments in Python 3."},
-    {"id": "q35", "chapter": 4, "question": "A Git repository has multiple developers working on different features. Which branching strategy best supports continuous integration?", "options": ["GitFlow with feature branches", "GitHub Flow with short-lived branches", "Single branch with frequent commits", "Long-lived feature branches with periodic merges"], "correct_answer": 1, "explanation": "GitHub Flow with short-lived branches supports continuous integration best."},
-    {"id": "q36", "chapter": 4, "question": "An Ansible playbook fails intermittently due to timing issues with service startups. Which directive addresses this problem?", "options": ["wait_for module to check service availability", "pause module to add fixed delays", "retries and delay parameters on tasks", "Both A and C provide solutions"], "correct_answer": 3, "explanation": "Both wait_for and retry mechanisms help handle timing issues."},
-    {"id": "q37", "chapter": 4, "question": "A Python script needs to parse JSON configuration files and handle missing keys gracefully. Which approach is most robust?", "options": ["Use json.loads() with try-except blocks", "Use json.loads() with get() method on dictionaries", "Validate JSON schema before parsing", "All of the above combined"], "correct_answer": 1, "explanation": "Using dict.get() is the simplest way to handle missing keys gracefully."},
-    {"id": "q38", "chapter": 4, "question": "Your CI/CD pipeline needs to run tests, build containers, and deploy to staging automatically. Which tool chain accomplishes this?", "options": ["Jenkins with Docker and Kubernetes plugins", "GitLab CI/CD with integrated container registry", "GitHub Actions with Docker and deployment workflows", "All of the above can accomplish this"], "correct_answer": 3, "explanation": "All major CI/CD platforms can accomplish automated testing and deployment."},
-    {"id": "q39", "chapter": 4, "question": "Ansible vault protects sensitive data in playbooks. Which command encrypts an existing variable file?", "options": ["ansible-vault encrypt vars.yml", "ansible-vault create vars.yml", "ansible-vault edit vars.yml", "ansible-playbook --vault-id vars.yml"], "correct_answer": 0, "explanation": "ansible-vault encrypt encrypts an existing file."},
-    {"id": "q40", "chapter": 4, "question": "Git merge conflicts occur frequently in a team environment. Which strategy minimizes conflicts?", "options": ["Frequent rebasing of feature branches", "Smaller, more focused commits", "Regular communication about code changes", "All of the above help minimize conflicts"], "correct_answer": 1, "explanation": "Smaller commits are easier to merge and resolve conflicts."},
-    
-    # Chapter 5: Troubleshooting and Performance
-    {"id": "q41", "chapter": 5, "question": "A production web server suddenly becomes unresponsive, and the SLA requires 99.9% uptime. Which monitoring approach provides the fastest incident detection?", "options": ["SNMP-based health checks every 30 seconds", "Synthetic transaction monitoring every 60 seconds", "Application log analysis every 5 minutes", "Manual availability checks every 15 minutes"], "correct_answer": 1, "explanation": "Synthetic monitoring simulates real user transactions for fast detection."},
-    {"id": "q42", "chapter": 5, "question": "Users report intermittent database connection failures. The SLI shows 98.5% success rate, but the SLO target is 99.5%. Which diagnostic approach identifies the root cause?", "options": ["Analyze connection timing patterns and error correlation", "Increase connection pool size immediately", "Restart the database service during maintenance window", "Implement connection retry logic in applications"], "correct_answer": 0, "explanation": "Root cause analysis requires examining patterns and correlating errors."},
-    {"id": "q43", "chapter": 5, "question": "A Linux server fails to boot after a kernel update, stopping at 'Kernel panic - not syncing'. Which recovery sequence resolves this issue?", "options": ["Boot from rescue media and reinstall the operating system", "Use GRUB rescue mode to boot with the previous kernel", "Perform hardware diagnostics on memory and storage", "Reset BIOS settings to factory defaults"], "correct_answer": 1, "explanation": "GRUB can boot an older kernel version to recover from failed kernel updates."},
-    {"id": "q44", "chapter": 5, "question": "Performance monitoring shows average CPU utilization at 45%, but users report slow response times. Which metric provides additional insight?", "options": ["Load average over 1, 5, and 15-minute intervals", "Total number of CPU cores and threads", "CPU cache hit ratio statistics", "Process nice values and priorities"], "correct_answer": 0, "explanation": "Load average shows if the system is overloaded despite moderate CPU usage."},
-    {"id": "q45", "chapter": 5, "question": "A filesystem shows read-only status after unexpected shutdown. The command 'mount -o remount,rw /dev/sdb1' fails. Which diagnostic step identifies the problem?", "options": ["Check disk space availability with df -h", "Examine block device errors in system logs", "Verify mount options in /etc/fstab", "Run fsck to detect and repair filesystem corruption"], "correct_answer": 3, "explanation": "fsck checks and repairs filesystem corruption after unexpected shutdowns."},
-    {"id": "q46", "chapter": 5, "question": "DNS resolution fails for external domains, but internal DNS works correctly. The command 'dig @8.8.8.8 google.com' times out. Which troubleshooting approach isolates the issue?", "options": ["Restart the local DNS resolver service", "Check firewall rules for outbound DNS traffic on port 53", "Flush the local DNS cache using systemd-resolve", "Verify network interface configuration and routing"], "correct_answer": 1, "explanation": "If external DNS queries timeout, firewall rules may be blocking port 53."},
-    {"id": "q47", "chapter": 5, "question": "System memory utilization shows 95% used, but 'free -h' indicates significant cached memory. Which command determines if the system has a memory pressure issue?", "options": ["vmstat 1 10 to monitor memory allocation patterns", "top -o %MEM to identify memory-intensive processes", "swapon -s to check swap space utilization", "All of the above provide complementary memory analysis"], "correct_answer": 3, "explanation": "Multiple tools together provide comprehensive memory analysis."},
-    {"id": "q48", "chapter": 5, "question": "A RAID 5 array shows 'degraded' status after a disk failure. One spare disk is available. Which action sequence properly rebuilds the array?", "options": ["The spare disk should automatically begin rebuilding without intervention", "Hot-swap the spare disk using mdadm --replace", "Force array rebuild with mdadm --create --force", "Replace the failed disk physically, then run mdadm --add /dev/md0 /dev/sdX"], "correct_answer": 3, "explanation": "Physical replacement followed by mdadm --add initiates rebuild properly."},
-    {"id": "q49", "chapter": 5, "question": "Network performance degrades significantly during peak hours. The iftop command shows high bandwidth utilization. Which approach identifies the traffic sources?", "options": ["Use tcpdump to capture packets for protocol analysis", "Implement QoS rules to prioritize critical traffic", "Monitor per-process network usage with nethogs", "Both A and C provide traffic source identification"], "correct_answer": 3, "explanation": "tcpdump and nethogs help identify which processes generate network traffic."},
-    {"id": "q50", "chapter": 5, "question": "A web application returns '502 Bad Gateway' errors intermittently. Application logs show database connection timeouts. Which performance optimization addresses this issue?", "options": ["Increase web server worker processes and connection limits", "Optimize database queries and implement connection pooling", "Add more memory to the database server", "Both A and B address different aspects of the problem"], "correct_answer": 1, "explanation": "Database connection pooling addresses timeout issues directly."},
-] + EXTENDED_QUESTIONS  # Add extended questions from questions_extended.py
-
-# ============ FLASHCARDS DATA ============
-
-FLASHCARDS = [
-    # Chapter 1
-    {"id": "f1", "chapter": 1, "front": "What is the EFI System Partition (ESP)?", "back": "A partition on a data storage device used by UEFI firmware to store boot loaders and applications. Typically formatted as FAT32.", "category": "Boot Process"},
-    {"id": "f2", "chapter": 1, "front": "What does 'dracut' do?", "back": "dracut regenerates the initramfs (initial RAM filesystem) with the necessary kernel modules and drivers for booting.", "category": "Boot Process"},
-    {"id": "f3", "chapter": 1, "front": "What is LVM?", "back": "Logical Volume Manager - allows flexible disk management by abstracting physical storage into logical volumes that can be resized dynamically.", "category": "Storage"},
-    {"id": "f4", "chapter": 1, "front": "What is the difference between vgcreate and vgextend?", "back": "vgcreate creates a NEW volume group from physical volumes. vgextend ADDS physical volumes to an EXISTING volume group.", "category": "Storage"},
-    {"id": "f5", "chapter": 1, "front": "What is KVM?", "back": "Kernel-based Virtual Machine - a Linux kernel module that turns the kernel into a hypervisor for running virtual machines.", "category": "Virtualization"},
-    {"id": "f6", "chapter": 1, "front": "What is the purpose of /etc/fstab?", "back": "Configuration file that defines how disk partitions, filesystems, and remote filesystems should be automatically mounted at boot.", "category": "Filesystems"},
-    {"id": "f7", "chapter": 1, "front": "What does 'netplan apply' do?", "back": "Applies network configuration changes defined in YAML files under /etc/netplan/ on Ubuntu systems.", "category": "Networking"},
-    {"id": "f8", "chapter": 1, "front": "What is udev?", "back": "The device manager for the Linux kernel that dynamically creates and removes device nodes in /dev/ based on hardware detection.", "category": "System"},
-    
-    # Chapter 2
-    {"id": "f9", "chapter": 2, "front": "What does SGID do on a directory?", "back": "When set on a directory, files created inside inherit the directory's group ownership instead of the creator's primary group.", "category": "Permissions"},
-    {"id": "f10", "chapter": 2, "front": "What is the difference between 'systemctl start' and 'systemctl enable'?", "back": "start: Starts the service NOW. enable: Configures the service to start automatically at BOOT.", "category": "Services"},
-    {"id": "f11", "chapter": 2, "front": "What are Linux Capabilities?", "back": "Fine-grained privileges that can be assigned to executables instead of full root access (e.g., CAP_NET_BIND_SERVICE for binding to low ports).", "category": "Security"},
-    {"id": "f12", "chapter": 2, "front": "What is a nice value?", "back": "A process priority value from -20 (highest priority) to 19 (lowest). Negative values give more CPU time.", "category": "Process Management"},
-    {"id": "f13", "chapter": 2, "front": "What is the difference between Docker and Podman?", "back": "Podman is daemonless (no background service), rootless by default, and compatible with Docker CLI commands.", "category": "Containers"},
-    {"id": "f14", "chapter": 2, "front": "What does 'setfacl' do?", "back": "Sets Access Control Lists (ACLs) on files/directories, allowing more granular permissions than standard chmod.", "category": "Permissions"},
-    
-    # Chapter 3
-    {"id": "f15", "chapter": 3, "front": "What is PAM?", "back": "Pluggable Authentication Modules - a framework for integrating multiple authentication schemes into Linux.", "category": "Authentication"},
-    {"id": "f16", "chapter": 3, "front": "What are the PAM control flags?", "back": "required, requisite, sufficient, optional - they determine how module success/failure affects overall authentication.", "category": "Authentication"},
-    {"id": "f17", "chapter": 3, "front": "What is SELinux?", "back": "Security-Enhanced Linux - a MAC (Mandatory Access Control) system that confines processes to minimum required permissions.", "category": "Security"},
-    {"id": "f18", "chapter": 3, "front": "What is the difference between iptables and nftables?", "back": "nftables is the modern replacement for iptables with better performance, unified syntax for IPv4/IPv6, and atomic rule updates.", "category": "Firewall"},
-    {"id": "f19", "chapter": 3, "front": "What does LUKS provide?", "back": "Linux Unified Key Setup - full disk encryption with multiple key slots, secure key management, and standard format.", "category": "Encryption"},
-    {"id": "f20", "chapter": 3, "front": "What is fail2ban?", "back": "Intrusion prevention software that monitors logs and bans IPs showing malicious signs (like repeated failed logins).", "category": "Security"},
-    
-    # Chapter 4
-    {"id": "f21", "chapter": 4, "front": "What is Ansible?", "back": "Agentless IT automation tool that uses SSH to configure systems, deploy software, and orchestrate tasks using YAML playbooks.", "category": "Automation"},
-    {"id": "f22", "chapter": 4, "front": "What is Terraform?", "back": "Infrastructure as Code tool for provisioning and managing cloud resources using declarative configuration files.", "category": "IaC"},
-    {"id": "f23", "chapter": 4, "front": "What is a Git branch?", "back": "A lightweight pointer to a commit that allows parallel development without affecting the main codebase.", "category": "Version Control"},
-    {"id": "f24", "chapter": 4, "front": "What does 'set -e' do in a shell script?", "back": "Causes the script to exit immediately if any command returns a non-zero exit status.", "category": "Scripting"},
-    {"id": "f25", "chapter": 4, "front": "What is CI/CD?", "back": "Continuous Integration/Continuous Deployment - automated processes for testing code changes and deploying to production.", "category": "DevOps"},
-    
-    # Chapter 5
-    {"id": "f26", "chapter": 5, "front": "What is load average?", "back": "Average number of processes waiting to run over 1, 5, and 15 minutes. Values higher than CPU cores indicate overload.", "category": "Performance"},
-    {"id": "f27", "chapter": 5, "front": "What does 'iostat -x' show?", "back": "Extended I/O statistics including disk utilization, average queue size, and service times per device.", "category": "Performance"},
-    {"id": "f28", "chapter": 5, "front": "What is inode exhaustion?", "back": "When a filesystem runs out of inodes (metadata structures), preventing new file creation even with free disk space.", "category": "Troubleshooting"},
-    {"id": "f29", "chapter": 5, "front": "What does the 'D' state mean in process status?", "back": "Uninterruptible sleep - usually indicates the process is waiting for I/O (disk/network). Too many D-state processes indicates I/O bottleneck.", "category": "Performance"},
-    {"id": "f30", "chapter": 5, "front": "What is fsck?", "back": "File System Consistency Check - repairs filesystem corruption, typically run on unmounted filesystems after crashes.", "category": "Troubleshooting"},
-] + EXTENDED_FLASHCARDS  # Add extended flashcards from questions_extended.py
+@api_router.put("/auth/timezone")
+async def update_timezone(tz: str, user = Depends(get_current_user)):
+    """Set the IANA timezone (e.g. Europe/Berlin) that defines the user's day boundaries"""
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz}")
+    await db.users.update_one({"id": user["id"]}, {"$set": {"timezone": tz}})
+    await invalidate_user(user["id"])
+    return {"success": True, "timezone": tz}
 
 # 20-Week Study Plan
 STUDY_PLAN = [
@@ -325,44 +921,414 @@ CHAPTERS = [
     {"id": 5, "title": "Troubleshooting & Performance", "title_de": "Fehlerbehebung & Leistung", "description": "Monitoring, diagnostics, optimization", "description_de": "Überwachung, Diagnose, Optimierung", "questions": 10, "weight": "22%"},
 ]
 
+# ============ CONTENT INDEX ============
+
+class ContentIndex:
+    """Read-only lookup tables over the question bank and flashcards.
+
+    Backed by the memory-mapped bank from content_store: chapters are parsed
+    the first time a request touches them, and ids resolve through the
+    prebuilt index, so request handlers never scan the full bank.
+    """
+
+    def __init__(self, bank):
+        self.bank = bank
+        self.version = bank.version
+        self.questions_by_chapter = LazyMapping(bank.chapters("questions"), lambda c: bank.chapter("questions", c))
+        self.questions_by_id = RecordView(bank, "questions")
+        self.flashcards_by_id = RecordView(bank, "flashcards")
+        # question_stats projection per chapter, so adaptive selection only reads that chapter's counters
+        self.question_stats_projections = LazyMapping(
+            bank.chapters("questions"),
+            lambda c: {"_id": 0, **{f"q.{q['id']}": 1 for q in bank.chapter("questions", c)}}
+        )
+        self.flashcards_by_chapter = LazyMapping(bank.chapters("flashcards"), lambda c: bank.chapter("flashcards", c))
+        self.flashcards_chapter_responses = LazyMapping(
+            bank.chapters("flashcards"), lambda c: StaticResponse(list(bank.chapter("flashcards", c)))
+        )
+
+    @cached_property
+    def flashcards_by_category(self):
+        buckets = {}
+        for card in self.bank.all("flashcards"):
+            buckets.setdefault(card["category"], []).append(card)
+        return MappingProxyType({category: tuple(cards) for category, cards in buckets.items()})
+
+    @cached_property
+    def flashcards_response(self):
+        return StaticResponse(list(self.bank.all("flashcards")))
+
+class ContentStore:
+    """Holds the current ContentIndex and swaps in a new one when the bank changes.
+
+    Indexes are never modified after construction (copy-on-write): a reload
+    builds a complete new index and replaces the reference in one assignment.
+    Requests pin the index they started with (see ContentVersionMiddleware),
+    so in-flight requests finish against the old version.
+    """
+
+    def __init__(self, content_dir: Path, chapters: set):
+        self.content_dir = content_dir
+        self.chapters = chapters
+        self._mtimes = self._watched_mtimes()
+        self.current = ContentIndex(open_bank(content_dir, chapters))
+        self.reloads = 0
+        self.last_error = None
+        # Created on first use so it belongs to the running event loop
+        self._lock = None
+
+    def _watched_mtimes(self) -> tuple:
+        mtimes = []
+        for path in watched_paths(self.content_dir):
+            try:
+                mtimes.append(path.stat().st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def reload(self) -> bool:
+        """Rebuild the bank if needed and swap it in; False when the version is unchanged"""
+        bank = open_bank(self.content_dir, self.chapters)
+        if bank.version == self.current.version:
+            bank.close()
+            return False
+        # The old bank is not closed: requests still holding it keep reading its mapping
+        self.current = ContentIndex(bank)
+        self.reloads += 1
+        return True
+
+    async def refresh(self) -> bool:
+        # The mtime watcher and cache bus events can both ask for a refresh;
+        # concurrent builds would write the same files
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            return await self._refresh()
+
+    async def _refresh(self) -> bool:
+        previous = self.current.version
+        try:
+            # Building and parsing the index happens off the event loop
+            changed = await asyncio.to_thread(self.reload)
+        except (ContentError, OSError, ValueError) as e:
+            # Keep serving the last good version; a half-saved file is retried on its
+            # next change, a bank removed by another worker's build on the next check
+            self.last_error = str(e)
+            logger.error(f"Content reload failed, still serving {previous}: {e}")
+            if isinstance(e, OSError):
+                self._mtimes = None
+            return False
+        self.last_error = None
+        # The rebuild rewrote the index; don't mistake that for another edit
+        self._mtimes = self._watched_mtimes()
+        if changed:
+            logger.info(f"Content reloaded: {previous} -> {self.current.version}")
+        return changed
+
+    async def watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            mtimes = self._watched_mtimes()
+            if mtimes == self._mtimes:
+                continue
+            self._mtimes = mtimes
+            if await self.refresh():
+                await CACHE_BUS.publish("content", self.current.version)
+
+    def stats(self) -> dict:
+        return {"version": self.current.version, "reloads": self.reloads, "last_error": self.last_error}
+
+# Content index pinned by the current request; unset outside of requests
+REQUEST_CONTENT = contextvars.ContextVar("REQUEST_CONTENT")
+
+def current_content() -> ContentIndex:
+    return REQUEST_CONTENT.get(None) or CONTENT_STORE.current
+
+class ContentVersionMiddleware:
+    """Pins one content version per request and reports it in X-Content-Version"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        content = CONTENT_STORE.current
+        token = REQUEST_CONTENT.set(content)
+        version = content.version.encode()
+
+        async def send_with_version(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-content-version", version)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_version)
+        finally:
+            REQUEST_CONTENT.reset(token)
+
+def expand_answers(answers: List[dict]) -> List[dict]:
+    """Join correct answers and explanations from the bank into stored quiz answers.
+
+    quiz_results only keeps question ids and the user's choice; older documents
+    that still embed the explanation are returned unchanged.
+    """
+    questions_by_id = current_content().questions_by_id
+    expanded = []
+    for answer in answers:
+        q = questions_by_id.get(answer["question_id"])
+        if q is None or "explanation" in answer:
+            expanded.append(answer)
+            continue
+        expanded.append({**answer, "correct": q["correct_answer"], "explanation": q["explanation"]})
+    return expanded
+
+EMPTY_LIST_RESPONSE = StaticResponse([])
+CHAPTERS_RESPONSE = StaticResponse(CHAPTERS)
+STUDY_PLAN_RESPONSE = StaticResponse(STUDY_PLAN)
+
+CONTENT_STORE = ContentStore(CONTENT_DIR, {c["id"] for c in CHAPTERS})
+
+# ============ ACTIVITY TRACKING ============
+
+# Daily activity is kept as a bitmap in the progress document: bit b of
+# activity.<w> marks local day w * ACTIVITY_WORD_BITS + b (days since 1970-01-01
+# in the user's timezone). One bit per day, updated with a single small write.
+ACTIVITY_WORD_BITS = 32
+ACTIVITY_WRITE_RETRIES = 5
+EPOCH_DATE = date(1970, 1, 1)
+
+def user_zone(user: dict):
+    try:
+        return ZoneInfo(user.get("timezone") or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+def local_day(user: dict, moment: Optional[datetime] = None) -> int:
+    moment = moment or datetime.now(timezone.utc)
+    return (moment.astimezone(user_zone(user)).date() - EPOCH_DATE).days
+
+def current_streak(progress: dict, today: int) -> int:
+    """Streak as of today: it is only broken once a whole day passes without activity"""
+    last = progress.get("last_active_day")
+    if last is None or last < today - 1:
+        return 0
+    return progress.get("streak_days", 0)
+
+def is_active(activity: dict, day: int) -> bool:
+    word, bit = divmod(day, ACTIVITY_WORD_BITS)
+    return bool(activity.get(str(word), 0) >> bit & 1)
+
+async def record_activity(user: dict, moment: Optional[datetime] = None):
+    """Mark the day of `moment` (default: today) as active and update streak_days.
+
+    Days before the last active day come from offline syncs: they only set
+    their bit, and extend the streak if they close the gap right before it.
+    The write only applies if nothing it was computed from changed since the
+    read; a concurrent write (a late sync racing a live quiz) makes it retry.
+    """
+    day = local_day(user, moment)
+    word, bit = divmod(day, ACTIVITY_WORD_BITS)
+    for _ in range(ACTIVITY_WRITE_RETRIES):
+        progress = await db.progress.find_one(
+            {"user_id": user["id"]},
+            {"_id": 0, "last_active_day": 1, "streak_days": 1, f"activity.{word}": 1}
+        ) or {}
+        last = progress.get("last_active_day")
+        stored = progress.get("activity", {}).get(str(word))
+        bits = stored or 0
+        if last == day or (last is not None and day < last and bits >> bit & 1):
+            return
+        bits |= 1 << bit
+        # None matches a missing field, so the guard also holds for new documents
+        guard = {
+            "user_id": user["id"],
+            "last_active_day": last,
+            "streak_days": progress.get("streak_days"),
+            f"activity.{word}": stored
+        }
+        update = {f"activity.{word}": bits}
+        streak = progress.get("streak_days", 0)
+        if last is None or day > last:
+            update["last_active_day"] = day
+            update["streak_days"] = streak + 1 if last == day - 1 else 1
+        elif day == last - streak:
+            # Count the run of active days that now leads into the streak
+            doc = await db.progress.find_one({"user_id": user["id"]}, {"_id": 0, "activity": 1}) or {}
+            activity = {**doc.get("activity", {}), str(word): bits}
+            first = day
+            while is_active(activity, first - 1):
+                first -= 1
+            update["streak_days"] = last - first + 1
+            for w in range((first - 1) // ACTIVITY_WORD_BITS, word):
+                guard[f"activity.{w}"] = doc.get("activity", {}).get(str(w))
+        try:
+            result = await db.progress.update_one(guard, {"$set": update}, upsert=not progress)
+        except DuplicateKeyError:
+            continue
+        if result.matched_count or result.upserted_id is not None:
+            return
+    logger.warning(f"Activity for user {user['id']} not recorded: too many concurrent updates")
+
+def active_days(activity: dict, first_day: int, last_day: int) -> List[int]:
+    days = []
+    for word in range(first_day // ACTIVITY_WORD_BITS, last_day // ACTIVITY_WORD_BITS + 1):
+        bits = activity.get(str(word), 0)
+        while bits:
+            low = bits & -bits
+            day = word * ACTIVITY_WORD_BITS + low.bit_length() - 1
+            if first_day <= day <= last_day:
+                days.append(day)
+            bits ^= low
+    return days
+
+# ============ ADAPTIVE SELECTION ============
+
+# Per-user answer counters live in one question_stats document per user:
+# {"user_id": ..., "q": {question_id: {"a": attempts, "c": correct}}}
+ADAPTIVE_UNSEEN_WEIGHT = 1.0
+
+def record_question_stats(user_id: str, answers: List[dict]):
+    """Return the update that adds graded answers to the user's counters"""
+    inc = {}
+    for answer in answers:
+        prefix = f"q.{answer['question_id']}"
+        inc[f"{prefix}.a"] = inc.get(f"{prefix}.a", 0) + 1
+        inc[f"{prefix}.c"] = inc.get(f"{prefix}.c", 0) + int(answer["is_correct"])
+    return db.question_stats.update_one({"user_id": user_id}, {"$inc": inc}, upsert=True)
+
+def question_weight(counters: Optional[dict]) -> float:
+    """Sampling weight: smoothed error rate, with unseen questions ranked highest"""
+    if not counters:
+        return ADAPTIVE_UNSEEN_WEIGHT
+    wrong = counters["a"] - counters["c"]
+    return (wrong + 1) / (counters["a"] + 2)
+
+def weighted_sample(questions, weights: List[float], k: int, rng=random) -> List[dict]:
+    """Weighted sampling without replacement (Efraimidis-Spirakis keys, top-k by heap)"""
+    keyed = ((rng.random() ** (1 / w), i) for i, w in enumerate(weights))
+    return [questions[i] for _, i in heapq.nlargest(k, keyed)]
+
 # ============ QUIZ ROUTES ============
 
 @api_router.get("/chapters")
-async def get_chapters():
-    return CHAPTERS
+async def get_chapters(request: Request):
+    return CHAPTERS_RESPONSE.respond(request)
 
-@api_router.get("/questions/{chapter}")
-async def get_questions(chapter: int, limit: int = 10):
-    chapter_questions = [q for q in QUESTIONS if q["chapter"] == chapter]
-    import random
-    random.shuffle(chapter_questions)
-    return chapter_questions[:limit]
+async def select_questions(chapter: int, limit: int, mode: str, user: Optional[dict]) -> List[dict]:
+    """Pick `limit` questions of a chapter.
 
-@api_router.post("/quiz/submit")
-async def submit_quiz(chapter: int, answers: List[QuizAnswer], user = Depends(get_current_user)):
-    if not user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    
-    chapter_questions = {q["id"]: q for q in QUESTIONS if q["chapter"] == chapter}
+    Adaptive mode reads only this chapter's counters and costs O(n log limit)
+    for the chapter's n questions: every question is weighted, the heap keeps
+    the top `limit` keys.
+    """
+    content = current_content()
+    chapter_questions = content.questions_by_chapter.get(chapter, ())
+    limit = max(0, min(limit, len(chapter_questions)))
+    if mode == "adaptive" and user and chapter_questions:
+        doc = await db.question_stats.find_one({"user_id": user["id"]}, content.question_stats_projections[chapter])
+        stats = (doc or {}).get("q", {})
+        weights = [question_weight(stats.get(q["id"])) for q in chapter_questions]
+        return weighted_sample(chapter_questions, weights, limit)
+    return random.sample(chapter_questions, limit)
+
+@api_router.get("/questions/{chapter}", response_model=List[QuizQuestion])
+async def get_questions(chapter: int, limit: int = 10, mode: Literal["random", "adaptive"] = "random", user = Depends(get_current_user)):
+    # Bank records are validated when the bank is built
+    return trusted_response(await select_questions(chapter, limit, mode, user))
+
+def grade_answers(chapter: int, answers: List[QuizAnswer]) -> tuple:
+    """Score answers against the bank; returns (correct, slim answers to store)"""
+    questions_by_id = current_content().questions_by_id
     correct = 0
-    results = []
+    stored_answers = []
     
     for answer in answers:
-        q = chapter_questions.get(answer.question_id)
-        if q:
+        q = questions_by_id.get(answer.question_id)
+        if q and q["chapter"] == chapter:
             is_correct = answer.selected_answer == q["correct_answer"]
             if is_correct:
                 correct += 1
-            results.append({
+            stored_answers.append({
                 "question_id": answer.question_id,
                 "selected": answer.selected_answer,
-                "correct": q["correct_answer"],
-                "is_correct": is_correct,
-                "explanation": q["explanation"]
+                "is_correct": is_correct
             })
+    return correct, stored_answers
+
+def quiz_progress_update(chapter: int, correct: int, total: int, now: str) -> dict:
+    """Progress update for one finished quiz.
+
+    Per-chapter aggregates are maintained here so get_progress never scans history;
+    the order-dependent last result and pass streak are set by record_chapter_result.
+    """
+    percentage = (correct / total * 100) if total > 0 else 0
+    stats = f"chapter_stats.{chapter}"
+    progress_update = {
+        "$inc": {
+            "total_quizzes": 1, "total_correct": correct, "total_questions": total,
+            f"{stats}.attempts": 1, f"{stats}.correct": correct, f"{stats}.questions": total,
+            f"{stats}.percentage_sum": round(percentage, 1)
+        },
+        "$max": {f"{stats}.best": round(percentage, 1)},
+        "$set": {"last_activity": now}
+    }
+    if percentage >= 70:
+        progress_update["$addToSet"] = {"chapters_completed": chapter}
+    return progress_update
+
+def record_chapter_result(user_id: str, chapter: int, correct: int, total: int, completed_at: str):
+    """Return the update of a chapter's last result and pass streak.
+
+    Offline attempts can arrive after newer ones, so it only applies when the
+    attempt is newer than the one that set them (completed_at is UTC ISO).
+    """
+    percentage = (correct / total * 100) if total > 0 else 0
+    stats = f"chapter_stats.{chapter}"
+    update = {"$set": {f"{stats}.last": round(percentage, 1), f"{stats}.last_completed_at": completed_at}}
+    if percentage >= 70:
+        update["$inc"] = {f"{stats}.streak": 1}
+    else:
+        update["$set"][f"{stats}.streak"] = 0
+    return db.progress.update_one(
+        {"user_id": user_id, "$or": [
+            {f"{stats}.last_completed_at": {"$lt": completed_at}}, {f"{stats}.last_completed_at": None}
+        ]},
+        update
+    )
+
+def chapter_stats_from_results(results) -> dict:
+    """Rebuild chapter_stats from quiz_results documents in completed_at order.
+
+    Mirrors quiz_progress_update; used to backfill users whose history
+    predates the aggregates (see backfill_chapter_stats.py).
+    """
+    chapter_stats = {}
+    for result in results:
+        total = result.get("total", 0)
+        percentage = (result.get("score", 0) / total * 100) if total > 0 else 0
+        stats = chapter_stats.setdefault(str(result["chapter"]), {
+            "attempts": 0, "correct": 0, "questions": 0, "percentage_sum": 0, "best": 0, "last": 0, "streak": 0
+        })
+        stats["attempts"] += 1
+        stats["correct"] += result.get("score", 0)
+        stats["questions"] += total
+        stats["percentage_sum"] += round(percentage, 1)
+        stats["best"] = max(stats["best"], round(percentage, 1))
+        stats["last"] = round(percentage, 1)
+        stats["last_completed_at"] = result.get("completed_at")
+        stats["streak"] = stats["streak"] + 1 if percentage >= 70 else 0
+    return chapter_stats
+
+@api_router.post("/quiz/submit", response_model=QuizSubmitResponse)
+async def submit_quiz(chapter: int, answers: List[QuizAnswer], user = Depends(get_current_user)):
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
     
+    correct, stored_answers = grade_answers(chapter, answers)
     total = len(answers)
     percentage = (correct / total * 100) if total > 0 else 0
+    now = datetime.now(timezone.utc).isoformat()
     
     quiz_result = {
         "id": str(uuid.uuid4()),
@@ -371,51 +1337,357 @@ async def submit_quiz(chapter: int, answers: List[QuizAnswer], user = Depends(ge
         "score": correct,
         "total": total,
         "percentage": round(percentage, 1),
-        "answers": results,
-        "completed_at": datetime.now(timezone.utc).isoformat()
+        "answers": stored_answers,
+        "completed_at": now,
+        # Lets other devices pick the attempt up through /sync
+        "sync_ms": int(time.time() * 1000)
     }
-    await db.quiz_results.insert_one(quiz_result)
     
-    # Update progress
-    await db.progress.update_one(
-        {"user_id": user["id"]},
-        {
-            "$inc": {"total_quizzes": 1, "total_correct": correct, "total_questions": total},
-            "$addToSet": {"chapters_completed": chapter} if percentage >= 70 else {},
-            "$set": {"last_activity": datetime.now(timezone.utc).isoformat()}
-        }
+    # The result insert and progress/stats updates are independent, so send them at once
+    writes = [
+        db.quiz_results.insert_one(quiz_result),
+        db.progress.update_one({"user_id": user["id"]}, quiz_progress_update(chapter, correct, total, now)),
+        record_chapter_result(user["id"], chapter, correct, total, now),
+        record_activity(user)
+    ]
+    if stored_answers:
+        writes.append(record_question_stats(user["id"], stored_answers))
+    await asyncio.gather(*writes)
+    
+    return trusted_response({
+        "id": quiz_result["id"], "score": correct, "total": total, "percentage": round(percentage, 1),
+        "results": expand_answers(stored_answers)
+    })
+
+# ============ EXAM SIMULATION ============
+
+class ExamQuestion(BaseModel):
+    id: str
+    chapter: int
+    question: str
+    options: List[str]
+
+class ExamStartResponse(BaseModel):
+    id: str
+    seed: int
+    started_at: str
+    deadline: str
+    duration_minutes: int
+    questions: List[ExamQuestion]
+
+class ExamSubmission(BaseModel):
+    # Selected option per question, in the order the exam was served; None = unanswered
+    answers: List[Optional[int]]
+
+def exam_allocation(count: int) -> dict:
+    """Split `count` questions across chapters by exam weight (largest remainder).
+
+    Chapters with too few questions in the bank hand their surplus on to the
+    remaining chapters.
+    """
+    weights = {c["id"]: float(c["weight"].rstrip("%")) for c in CHAPTERS}
+    available = {chapter: len(current_content().questions_by_chapter.get(chapter, ())) for chapter in weights}
+    allocation = {chapter: 0 for chapter in weights}
+    remaining = min(count, sum(available.values()))
+    while remaining > 0:
+        open_chapters = {c: w for c, w in weights.items() if allocation[c] < available[c]}
+        total_weight = sum(open_chapters.values())
+        shares = {c: remaining * w / total_weight for c, w in open_chapters.items()}
+        grants = {c: min(int(share), available[c] - allocation[c]) for c, share in shares.items()}
+        leftover = remaining - sum(grants.values())
+        for c in sorted(open_chapters, key=lambda c: shares[c] - int(shares[c]), reverse=True):
+            if leftover == 0:
+                break
+            if grants[c] < available[c] - allocation[c]:
+                grants[c] += 1
+                leftover -= 1
+        for c, granted in grants.items():
+            allocation[c] += granted
+        remaining = leftover
+    return allocation
+
+def build_exam(seed: int, count: int) -> List[dict]:
+    """Weight-stratified, reproducible question selection for a given seed"""
+    rng = random.Random(seed)
+    questions = []
+    for chapter, n in sorted(exam_allocation(count).items()):
+        questions.extend(rng.sample(current_content().questions_by_chapter.get(chapter, ()), n))
+    rng.shuffle(questions)
+    return questions
+
+@api_router.post("/exam/start", response_model=ExamStartResponse)
+async def start_exam(seed: Optional[int] = None, user = Depends(get_current_user)):
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    if seed is None:
+        seed = secrets.randbits(32)
+    questions = build_exam(seed, EXAM_QUESTION_COUNT)
+    started_at = datetime.now(timezone.utc)
+    deadline = started_at + timedelta(minutes=EXAM_DURATION_MINUTES)
+    session = {
+        "id": str(uuid.uuid4()),
+        "user_id": user["id"],
+        "seed": seed,
+        # A seed only reproduces the same exam against the same bank version
+        "content_version": current_content().version,
+        "question_ids": [q["id"] for q in questions],
+        "correct_answers": [q["correct_answer"] for q in questions],
+        "started_at": started_at.isoformat(),
+        "deadline": deadline.isoformat(),
+        "submitted": False
+    }
+    await db.exam_sessions.insert_one(session)
+    
+    return trusted_response({
+        "id": session["id"],
+        "seed": seed,
+        "started_at": session["started_at"],
+        "deadline": session["deadline"],
+        "duration_minutes": EXAM_DURATION_MINUTES,
+        # Answers and explanations stay on the server until submission
+        "questions": [
+            {"id": q["id"], "chapter": q["chapter"], "question": q["question"], "options": q["options"]}
+            for q in questions
+        ]
+    })
+
+@api_router.post("/exam/{exam_id}/submit")
+async def submit_exam(exam_id: str, submission: ExamSubmission, user = Depends(get_current_user)):
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    now = datetime.now(timezone.utc)
+    # Claim the session atomically so an exam can only be scored once
+    session = await db.exam_sessions.find_one_and_update(
+        {"id": exam_id, "user_id": user["id"], "submitted": False},
+        {"$set": {"submitted": True, "submitted_at": now.isoformat()}},
+        projection={"_id": 0}
     )
+    if not session:
+        raise HTTPException(status_code=404, detail="Exam not found or already submitted")
+    if now > datetime.fromisoformat(session["deadline"]) + timedelta(seconds=EXAM_GRACE_SECONDS):
+        await db.exam_sessions.update_one({"id": exam_id}, {"$set": {"expired": True}})
+        raise HTTPException(status_code=409, detail="Exam time has expired")
+    
+    correct_answers = session["correct_answers"]
+    selected = (submission.answers + [None] * len(correct_answers))[:len(correct_answers)]
+    # Score all answers in one pass over the two parallel arrays
+    hits = [s == c for s, c in zip(selected, correct_answers)]
+    score = sum(hits)
+    total = len(correct_answers)
+    percentage = round(score / total * 100, 1) if total else 0
+    
+    questions_by_id = current_content().questions_by_id
+    by_chapter = {}
+    results = []
+    for question_id, choice, is_correct in zip(session["question_ids"], selected, hits):
+        q = questions_by_id.get(question_id)
+        chapter = q["chapter"] if q else None
+        bucket = by_chapter.setdefault(chapter, {"chapter": chapter, "correct": 0, "total": 0})
+        bucket["total"] += 1
+        bucket["correct"] += is_correct
+        results.append({"question_id": question_id, "selected": choice, "is_correct": is_correct})
+    
+    await asyncio.gather(
+        db.exam_sessions.update_one(
+            {"id": exam_id},
+            {"$set": {"answers": selected, "score": score, "percentage": percentage}}
+        ),
+        record_question_stats(user["id"], results)
+    )
+    
+    return {
+        "id": exam_id,
+        "score": score,
+        "total": total,
+        "percentage": percentage,
+        "passed": percentage >= EXAM_PASSING_PERCENTAGE,
+        "unanswered": selected.count(None),
+        "chapters": sorted(by_chapter.values(), key=lambda b: b["chapter"] or 0),
+        "results": expand_answers(results)
+    }
+
+# ============ SPACED REPETITION ============
+
+# SM-2 style scheduling with the four grades used by the flashcard UI.
+# Each user has one sr_states document whose "cards" map holds a packed
+# [due_ts, interval_days, ease, repetitions, lapses, reviewed_ts, sync_ms]
+# array per reviewed card. The last two drive /sync: reviewed_ts is the
+# last-writer-wins clock, sync_ms the server time the state was written.
+# Older states only have the first five fields.
+SR_GRADES = ("again", "hard", "good", "easy")
+SR_INITIAL_EASE = 2.5
+SR_MIN_EASE = 1.3
+SR_AGAIN_INTERVAL = 6 / 1440  # 6 minutes, in days
+SR_MAX_BATCH = 500
+
+class FlashcardReview(BaseModel):
+    card_id: str
+    grade: Literal["again", "hard", "good", "easy"]
+    reviewed_at: Optional[datetime] = None
+
+class FlashcardReviewBatch(BaseModel):
+    reviews: List[FlashcardReview]
+
+def sm2_review(state: Optional[list], grade: str, now_ts: float) -> list:
+    """Apply one graded review to a packed card state and return the new state (without sync_ms)"""
+    _, interval, ease, reps, lapses = (state or (0, 0.0, SR_INITIAL_EASE, 0, 0))[:5]
+    if grade == "again":
+        interval, reps, lapses = SR_AGAIN_INTERVAL, 0, lapses + 1
+        ease = max(SR_MIN_EASE, ease - 0.2)
+    elif grade == "hard":
+        interval = 1 / 24 if reps == 0 else interval * 1.2
+        ease = max(SR_MIN_EASE, ease - 0.15)
+        reps += 1
+    elif grade == "good":
+        interval = 1 if reps == 0 else 6 if reps == 1 else interval * ease
+        reps += 1
+    else:
+        interval = 3 if reps == 0 else interval * ease * 1.3
+        ease += 0.15
+        reps += 1
+    return [int(now_ts + interval * 86400), round(interval, 4), round(ease, 2), reps, lapses, int(now_ts)]
+
+def due_cards(cards: dict, candidates, now_ts: float, limit: int) -> tuple:
+    """Pick up to `limit` cards: overdue reviews first (earliest due first), then new cards.
+
+    Returns (card_ids, due_count, new_count).
+    """
+    heap = []
+    new_ids = []
+    for card_id in candidates:
+        state = cards.get(card_id)
+        if state is None:
+            new_ids.append(card_id)
+        elif state[0] <= now_ts:
+            heap.append((state[0], card_id))
+    heapq.heapify(heap)
+    due_count = len(heap)
+    picked = [heapq.heappop(heap)[1] for _ in range(min(limit, due_count))]
+    picked.extend(new_ids[:limit - len(picked)])
+    return picked, due_count, len(new_ids)
+
+# Registered before /flashcards/{chapter} so "due" is not parsed as a chapter
+@api_router.get("/flashcards/due")
+async def get_due_flashcards(limit: int = 20, chapter: Optional[int] = None, user = Depends(get_current_user)):
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    doc = await db.sr_states.find_one({"user_id": user["id"]}, {"_id": 0, "cards": 1})
+    cards = (doc or {}).get("cards", {})
+    content = current_content()
+    if chapter is None:
+        candidates = content.flashcards_by_id.keys()
+    else:
+        candidates = [f["id"] for f in content.flashcards_by_chapter.get(chapter, ())]
+    
+    picked, due_count, new_count = due_cards(cards, candidates, time.time(), max(0, limit))
+    result = []
+    for card_id in picked:
+        state = cards.get(card_id)
+        result.append({
+            **content.flashcards_by_id[card_id],
+            "status": "due" if state else "new",
+            "due_at": datetime.fromtimestamp(state[0], timezone.utc).isoformat() if state else None
+        })
+    return {"cards": result, "due_count": due_count, "new_count": new_count}
+
+@api_router.post("/flashcards/review")
+async def review_flashcards(batch: FlashcardReviewBatch, user = Depends(get_current_user)):
+    """Record one or more graded reviews and reschedule the cards"""
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    if len(batch.reviews) > SR_MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {SR_MAX_BATCH} reviews per request")
+    
+    flashcards_by_id = current_content().flashcards_by_id
+    reviews = [r for r in batch.reviews if r.card_id in flashcards_by_id]
+    if not reviews:
+        return {"success": True, "reviewed": 0, "cards": {}}
     
-    return {"id": quiz_result["id"], "score": correct, "total": total, "percentage": round(percentage, 1), "results": results}
+    doc = await db.sr_states.find_one({"user_id": user["id"]}, {"_id": 0, "cards": 1})
+    cards = (doc or {}).get("cards", {})
+    updated = {}
+    now_ts = time.time()
+    # Offline batches are replayed in the order the reviews happened
+    for review in sorted(reviews, key=lambda r: r.reviewed_at.timestamp() if r.reviewed_at else now_ts):
+        reviewed_ts = review.reviewed_at.timestamp() if review.reviewed_at else now_ts
+        updated[review.card_id] = sm2_review(updated.get(review.card_id, cards.get(review.card_id)), review.grade, reviewed_ts)
+    
+    await asyncio.gather(
+        db.sr_states.update_one(
+            {"user_id": user["id"]},
+            {"$set": {f"cards.{card_id}": [*state, int(now_ts * 1000)] for card_id, state in updated.items()}},
+            upsert=True
+        ),
+        db.progress.update_one(
+            {"user_id": user["id"]},
+            {"$inc": {"flashcards_reviewed": len(reviews)}, "$set": {"last_activity": datetime.now(timezone.utc).isoformat()}}
+        ),
+        record_activity(user)
+    )
+    return {
+        "success": True,
+        "reviewed": len(reviews),
+        "cards": {
+            card_id: {"due_at": datetime.fromtimestamp(state[0], timezone.utc).isoformat(), "interval_days": state[1]}
+            for card_id, state in updated.items()
+        }
+    }
 
 # ============ FLASHCARDS ROUTES ============
 
 @api_router.get("/flashcards/{chapter}")
-async def get_flashcards(chapter: int):
-    return [f for f in FLASHCARDS if f["chapter"] == chapter]
+async def get_flashcards(chapter: int, request: Request):
+    return current_content().flashcards_chapter_responses.get(chapter, EMPTY_LIST_RESPONSE).respond(request)
 
 @api_router.get("/flashcards")
-async def get_all_flashcards():
-    return FLASHCARDS
+async def get_all_flashcards(request: Request, category: Optional[str] = None):
+    if category is not None:
+        return list(current_content().flashcards_by_category.get(category, ()))
+    return current_content().flashcards_response.respond(request)
 
 @api_router.post("/flashcards/reviewed")
 async def mark_flashcard_reviewed(user = Depends(get_current_user)):
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    await db.progress.update_one(
-        {"user_id": user["id"]},
-        {"$inc": {"flashcards_reviewed": 1}, "$set": {"last_activity": datetime.now(timezone.utc).isoformat()}}
+    await asyncio.gather(
+        db.progress.update_one(
+            {"user_id": user["id"]},
+            {"$inc": {"flashcards_reviewed": 1}, "$set": {"last_activity": datetime.now(timezone.utc).isoformat()}}
+        ),
+        record_activity(user)
     )
     return {"success": True}
 
 # ============ PROGRESS ROUTES ============
 
-@api_router.get("/progress")
+# trusted_response skips response_model filtering, so the queries only fetch documented fields
+QUIZ_HISTORY_SUMMARY = {"_id": 0, **{field: 1 for field in QuizSummary.model_fields}}
+# last_active_day is read for the streak and removed before responding
+PROGRESS_SUMMARY = {"_id": 0, "last_active_day": 1, **{field: 1 for field in UserProgress.model_fields}}
+
+def summarize_chapter_stats(stats: dict) -> dict:
+    attempts = stats.get("attempts", 0)
+    questions = stats.get("questions", 0)
+    return {
+        "attempts": attempts,
+        "correct": stats.get("correct", 0),
+        "questions": questions,
+        "accuracy": round(stats.get("correct", 0) / questions * 100, 1) if questions else 0,
+        "best": stats.get("best", 0),
+        "last": stats.get("last", 0),
+        "average": round(stats.get("percentage_sum", 0) / attempts, 1) if attempts else 0,
+        "streak": stats.get("streak", 0)
+    }
+
+@api_router.get("/progress", response_model=ProgressResponse)
 async def get_progress(user = Depends(get_current_user)):
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    progress = await db.progress.find_one({"user_id": user["id"]}, {"_id": 0})
+    progress = await db.progress.find_one({"user_id": user["id"]}, PROGRESS_SUMMARY)
     if not progress:
         progress = {
             "user_id": user["id"],
@@ -426,26 +1698,369 @@ async def get_progress(user = Depends(get_current_user)):
             "current_week": 1,
             "streak_days": 0,
             "last_activity": "",
-            "flashcards_reviewed": 0
+            "flashcards_reviewed": 0,
+            "chapter_stats": {}
         }
     
-    # Get quiz history
-    quiz_history = await db.quiz_results.find({"user_id": user["id"]}, {"_id": 0}).sort("completed_at", -1).limit(10).to_list(10)
+    progress["streak_days"] = current_streak(progress, local_day(user))
+    progress.pop("last_active_day", None)
+    progress["chapter_stats"] = {
+        chapter: summarize_chapter_stats(stats) for chapter, stats in progress.get("chapter_stats", {}).items()
+    }
+    
+    # Recent attempts without their answers to keep the dashboard payload small
+    quiz_history = await db.quiz_results.find({"user_id": user["id"]}, QUIZ_HISTORY_SUMMARY).sort("completed_at", -1).limit(10).to_list(10)
+    
+    return trusted_response({**progress, "quiz_history": quiz_history})
+
+QUIZ_HISTORY_FIELDS = ("id", "chapter", "score", "total", "percentage", "answers", "completed_at")
+QUIZ_HISTORY_MAX_LIMIT = 100
+
+def encode_history_cursor(doc: dict) -> str:
+    return base64.urlsafe_b64encode(f"{doc['completed_at']}|{doc['id']}".encode()).decode()
+
+def decode_history_cursor(cursor: str) -> tuple:
+    try:
+        completed_at, result_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return completed_at, result_id
+
+@api_router.get("/quiz/history")
+async def get_quiz_history(
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    chapter: Optional[int] = None,
+    fields: Optional[str] = None,
+    user = Depends(get_current_user)
+):
+    """Page through the user's quiz attempts, newest first.
+
+    Keyset pagination on (completed_at, id): pass `next_cursor` from one page
+    as `cursor` to get the next. `fields` is a comma-separated projection.
+    The page is streamed straight from the Mongo cursor.
+    """
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    limit = max(1, min(limit, QUIZ_HISTORY_MAX_LIMIT))
+    selected = QUIZ_HISTORY_FIELDS
+    if fields:
+        selected = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = set(selected) - set(QUIZ_HISTORY_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    # completed_at and id are always loaded because the next cursor is built from them
+    projection = {"_id": 0, "completed_at": 1, "id": 1, **{f: 1 for f in selected}}
     
-    return {**progress, "quiz_history": quiz_history}
+    query = {"user_id": user["id"]}
+    if chapter is not None:
+        query["chapter"] = chapter
+    if cursor:
+        completed_at, result_id = decode_history_cursor(cursor)
+        query["$or"] = [
+            {"completed_at": {"$lt": completed_at}},
+            {"completed_at": completed_at, "id": {"$lt": result_id}}
+        ]
+    
+    results = db.quiz_results.find(query, projection).sort([("completed_at", DESCENDING), ("id", DESCENDING)]).limit(limit + 1)
+    
+    async def body():
+        yield b'{"items":['
+        count = 0
+        last = None
+        async for doc in results:
+            if count == limit:
+                # One extra document only tells us that another page exists
+                yield f'],"next_cursor":"{encode_history_cursor(last)}"}}'.encode()
+                return
+            if "answers" in doc:
+                doc["answers"] = expand_answers(doc["answers"])
+            last = doc
+            item = {f: doc[f] for f in selected if f in doc}
+            yield (b"," if count else b"") + json.dumps(item, ensure_ascii=False).encode("utf-8")
+            count += 1
+        yield b'],"next_cursor":null}'
+    
+    return StreamingResponse(body(), media_type="application/json")
 
 @api_router.put("/progress/week")
 async def update_week(week: int, user = Depends(get_current_user)):
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    await db.progress.update_one({"user_id": user["id"]}, {"$set": {"current_week": week}})
+    # Stamped like a synced change, so /sync reports it and older offline changes lose
+    now_ms = int(time.time() * 1000)
+    await db.progress.update_one(
+        {"user_id": user["id"]},
+        {"$set": {"current_week": week, "sync_clocks.current_week": [now_ms, now_ms]}}
+    )
     return {"success": True, "current_week": week}
 
+@api_router.get("/progress/activity")
+async def get_activity(days: int = 365, user = Depends(get_current_user)):
+    """Active days for a calendar heatmap, read from the activity bitmap"""
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    days = max(1, min(days, 3660))
+    today = local_day(user)
+    first_day = today - days + 1
+    words = range(first_day // ACTIVITY_WORD_BITS, today // ACTIVITY_WORD_BITS + 1)
+    projection = {"_id": 0, "last_active_day": 1, "streak_days": 1, **{f"activity.{w}": 1 for w in words}}
+    progress = await db.progress.find_one({"user_id": user["id"]}, projection) or {}
+    
+    active = active_days(progress.get("activity", {}), first_day, today)
+    return {
+        "timezone": str(user_zone(user)),
+        "from": (EPOCH_DATE + timedelta(days=first_day)).isoformat(),
+        "to": (EPOCH_DATE + timedelta(days=today)).isoformat(),
+        "streak_days": current_streak(progress, today),
+        "active_days": [(EPOCH_DATE + timedelta(days=d)).isoformat() for d in active]
+    }
+
+# ============ SYNC ============
+
+# Offline-first clients (web app and Electron) keep progress locally and send
+# batched deltas to POST /sync. Every merge is idempotent:
+# - quiz attempts are keyed by the client's attempt id and counted once
+# - flashcard states and the current week are last-writer-wins on the time
+#   the change was made on the client
+# Changes are stamped with the server time in ms (sync_ms). The returned token
+# is the time the sync started; the next sync receives everything stamped
+# since then, with an overlap so writes that were still in flight are not
+# missed. Items that arrive twice merge to the same state. When more attempts
+# changed than fit in one response, the token instead continues after the
+# last attempt sent, keyed on (sync_ms, id) because one sync stamps all of
+# its attempts with the same ms.
+SYNC_OVERLAP_MS = 5000
+SYNC_MAX_ITEMS = 500
+SYNC_FULL_HISTORY = 50
+SYNC_ATTEMPT_FIELDS = {**QUIZ_HISTORY_SUMMARY, "client_id": 1, "sync_ms": 1}
+SYNC_PROGRESS_DEFAULTS = {
+    "total_quizzes": 0, "total_correct": 0, "total_questions": 0,
+    "chapters_completed": [], "current_week": 1, "flashcards_reviewed": 0
+}
+
+class SyncQuizAttempt(BaseModel):
+    client_id: str = Field(min_length=1, max_length=64)
+    chapter: int
+    completed_at: datetime
+    answers: List[QuizAnswer] = []
+    # Only used for attempts recorded without their individual answers
+    score: int = Field(0, ge=0)
+    total: int = Field(0, ge=0)
+
+class SyncCardState(BaseModel):
+    card_id: str
+    reviewed_at: datetime
+    interval_days: float = Field(ge=0)
+    ease: float = Field(SR_INITIAL_EASE, ge=SR_MIN_EASE)
+    repetitions: int = Field(0, ge=0)
+    lapses: int = Field(0, ge=0)
+    due_at: Optional[datetime] = None
+
+class SyncWeek(BaseModel):
+    week: int = Field(ge=1, le=len(STUDY_PLAN))
+    changed_at: datetime
+
+class SyncRequest(BaseModel):
+    token: Optional[str] = None
+    quiz_attempts: List[SyncQuizAttempt] = []
+    cards: List[SyncCardState] = []
+    current_week: Optional[SyncWeek] = None
+
+def encode_sync_token(ms: int, after_id: Optional[str] = None) -> str:
+    return base64.urlsafe_b64encode((f"{ms}:{after_id}" if after_id else str(ms)).encode()).decode()
+
+def decode_sync_token(token: str) -> tuple:
+    """(ms, after_id); after_id is only set when continuing an incomplete page"""
+    try:
+        ms, _, after_id = base64.urlsafe_b64decode(token.encode()).decode().partition(":")
+        return int(ms), after_id or None
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+def _as_utc(moment: datetime) -> datetime:
+    # Client timestamps without an offset are taken as UTC
+    return moment.astimezone(timezone.utc) if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+def _epoch_ms(moment: datetime) -> int:
+    return int(_as_utc(moment).timestamp() * 1000)
+
+def card_state_response(card_id: str, state: list) -> dict:
+    return {
+        "card_id": card_id,
+        "due_at": datetime.fromtimestamp(state[0], timezone.utc).isoformat(),
+        "interval_days": state[1],
+        "ease": state[2],
+        "repetitions": state[3],
+        "lapses": state[4],
+        "reviewed_at": datetime.fromtimestamp(state[5], timezone.utc).isoformat() if len(state) > 5 else None
+    }
+
+async def merge_quiz_attempt(user: dict, attempt: SyncQuizAttempt, now_ms: int) -> bool:
+    """Store an offline attempt unless it is already known; True if it was new"""
+    if attempt.answers:
+        correct, stored_answers = grade_answers(attempt.chapter, attempt.answers)
+        total = len(attempt.answers)
+    else:
+        total = attempt.total
+        correct, stored_answers = min(attempt.score, total), []
+    percentage = (correct / total * 100) if total > 0 else 0
+    quiz_result = {
+        "id": str(uuid.uuid4()),
+        "user_id": user["id"],
+        "client_id": attempt.client_id,
+        "chapter": attempt.chapter,
+        "score": correct,
+        "total": total,
+        "percentage": round(percentage, 1),
+        "answers": stored_answers,
+        "completed_at": _as_utc(attempt.completed_at).isoformat(),
+        "sync_ms": now_ms
+    }
+    try:
+        result = await db.quiz_results.update_one(
+            {"user_id": user["id"], "client_id": attempt.client_id},
+            {"$setOnInsert": quiz_result},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # A concurrent sync inserted the same attempt first
+        return False
+    if result.upserted_id is None:
+        return False
+    
+    writes = [
+        db.progress.update_one(
+            {"user_id": user["id"]},
+            quiz_progress_update(attempt.chapter, correct, total, datetime.now(timezone.utc).isoformat())
+        ),
+        record_chapter_result(user["id"], attempt.chapter, correct, total, quiz_result["completed_at"])
+    ]
+    if stored_answers:
+        writes.append(record_question_stats(user["id"], stored_answers))
+    # The study day is the day of the attempt; a clock running ahead counts as today
+    writes.append(record_activity(user, min(_as_utc(attempt.completed_at), datetime.now(timezone.utc))))
+    await asyncio.gather(*writes)
+    return True
+
+@api_router.post("/sync")
+async def sync_progress(data: SyncRequest, user = Depends(get_current_user)):
+    """Merge offline changes and return what changed on the server since the client's token"""
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    if len(data.quiz_attempts) + len(data.cards) > SYNC_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {SYNC_MAX_ITEMS} items per sync")
+    since = after_id = None
+    if data.token:
+        token_ms, after_id = decode_sync_token(data.token)
+        # A continuation resumes exactly after the last attempt of the previous page
+        since = token_ms if after_id else token_ms - SYNC_OVERLAP_MS
+    now_ms = int(time.time() * 1000)
+    
+    # Attempts in the order they were taken, so per-chapter pass streaks build up
+    # within the batch; merged before progress is read so the totals below include them
+    new_attempts = 0
+    for attempt in sorted(data.quiz_attempts, key=lambda a: _epoch_ms(a.completed_at)):
+        new_attempts += await merge_quiz_attempt(user, attempt, now_ms)
+    
+    sr_doc, progress = await asyncio.gather(
+        db.sr_states.find_one({"user_id": user["id"]}, {"_id": 0, "cards": 1}),
+        db.progress.find_one({"user_id": user["id"]}, {"_id": 0, "activity": 0, "chapter_stats": 0})
+    )
+    cards = (sr_doc or {}).get("cards", {})
+    progress = progress or {}
+    
+    flashcards_by_id = current_content().flashcards_by_id
+    won_cards = {}
+    lost_cards = set()
+    for card in data.cards:
+        if card.card_id not in flashcards_by_id:
+            continue
+        reviewed_ts = _epoch_ms(card.reviewed_at) // 1000
+        current = won_cards.get(card.card_id) or cards.get(card.card_id)
+        # Ties keep the server state, so replays of the same review change nothing
+        if current is not None and len(current) > 5 and current[5] >= reviewed_ts:
+            lost_cards.add(card.card_id)
+            continue
+        due_ts = _epoch_ms(card.due_at) // 1000 if card.due_at else int(reviewed_ts + card.interval_days * 86400)
+        won_cards[card.card_id] = [
+            due_ts, round(card.interval_days, 4), round(card.ease, 2), card.repetitions, card.lapses, reviewed_ts, now_ms
+        ]
+    
+    week_clock = progress.get("sync_clocks", {}).get("current_week", [0, 0])
+    week_won = data.current_week is not None and _epoch_ms(data.current_week.changed_at) > week_clock[0]
+    
+    writes = []
+    if won_cards:
+        writes.append(db.sr_states.update_one(
+            {"user_id": user["id"]},
+            {"$set": {f"cards.{card_id}": state for card_id, state in won_cards.items()}},
+            upsert=True
+        ))
+        cards = {**cards, **won_cards}
+    if week_won:
+        week_clock = [_epoch_ms(data.current_week.changed_at), now_ms]
+        writes.append(db.progress.update_one(
+            {"user_id": user["id"]},
+            {"$set": {"current_week": data.current_week.week, "sync_clocks.current_week": week_clock}}
+        ))
+        progress["current_week"] = data.current_week.week
+    await asyncio.gather(*writes)
+    
+    # Server-side changes the client has not seen, minus what it just sent us
+    sent_attempts = {a.client_id for a in data.quiz_attempts}
+    if since is None:
+        query = db.quiz_results.find({"user_id": user["id"]}, SYNC_ATTEMPT_FIELDS).sort("completed_at", DESCENDING).limit(SYNC_FULL_HISTORY)
+    else:
+        attempt_filter = {"user_id": user["id"], "sync_ms": {"$gte": since}}
+        if after_id:
+            attempt_filter = {"user_id": user["id"], "$or": [
+                {"sync_ms": {"$gt": since}}, {"sync_ms": since, "id": {"$gt": after_id}}
+            ]}
+        query = db.quiz_results.find(attempt_filter, SYNC_ATTEMPT_FIELDS).sort(
+            [("sync_ms", ASCENDING), ("id", ASCENDING)]
+        ).limit(SYNC_MAX_ITEMS + 1)
+    fetched = await query.to_list(None)
+    # Decided before dropping the client's own attempts, so a page is never cut short
+    has_more = since is not None and len(fetched) > SYNC_MAX_ITEMS
+    token = encode_sync_token(now_ms)
+    if has_more:
+        fetched = fetched[:SYNC_MAX_ITEMS]
+        token = encode_sync_token(fetched[-1]["sync_ms"], fetched[-1]["id"])
+    changed_attempts = [a for a in fetched if a.get("client_id") not in sent_attempts]
+    for attempt in changed_attempts:
+        attempt.pop("sync_ms", None)
+    
+    # States the client sent but lost are returned too, so it drops its stale copy
+    changed_cards = [
+        card_state_response(card_id, state) for card_id, state in cards.items()
+        if card_id not in won_cards and (
+            since is None or card_id in lost_cards or (len(state) > 6 and state[6] >= since)
+        )
+    ]
+    week_lost = data.current_week is not None and not week_won
+    week_changed = not week_won and (since is None or week_lost or week_clock[1] >= since)
+    
+    return {
+        "token": token,
+        "has_more": has_more,
+        "applied": {"quiz_attempts": new_attempts, "cards": len(won_cards), "current_week": week_won},
+        "progress": {
+            **{field: progress.get(field, default) for field, default in SYNC_PROGRESS_DEFAULTS.items()},
+            "streak_days": current_streak(progress, local_day(user))
+        },
+        "quiz_attempts": changed_attempts,
+        "cards": changed_cards,
+        "current_week": progress.get("current_week", 1) if week_changed else None
+    }
+
 # ============ STUDY PLAN ROUTES ============
 
 @api_router.get("/studyplan")
-async def get_study_plan():
-    return STUDY_PLAN
+async def get_study_plan(request: Request):
+    return STUDY_PLAN_RESPONSE.respond(request)
 
 # ============ AI EXPLANATION ROUTES ============
 
@@ -489,6 +2104,43 @@ AI_PROVIDERS = {
     }
 }
 
+# Long-lived HTTP clients, one per provider, so explanations reuse pooled
+# keep-alive connections instead of a fresh TCP+TLS handshake per request.
+# Providers may override the defaults with "connect_timeout" / "read_timeout".
+AI_CONNECT_TIMEOUT = float(os.environ.get('AI_CONNECT_TIMEOUT', '5'))
+AI_READ_TIMEOUT = float(os.environ.get('AI_READ_TIMEOUT', '60'))
+AI_MAX_CONNECTIONS = int(os.environ.get('AI_MAX_CONNECTIONS', '20'))
+AI_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get('AI_MAX_KEEPALIVE_CONNECTIONS', '10'))
+
+try:
+    import h2  # noqa: F401 -- optional, enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+AI_CLIENTS = {}
+
+def get_ai_client(provider_id: str) -> httpx.AsyncClient:
+    http_client = AI_CLIENTS.get(provider_id)
+    if http_client is None or http_client.is_closed:
+        config = AI_PROVIDERS[provider_id]
+        read_timeout = config.get("read_timeout", AI_READ_TIMEOUT)
+        http_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(read_timeout, connect=config.get("connect_timeout", AI_CONNECT_TIMEOUT)),
+            limits=httpx.Limits(
+                max_connections=AI_MAX_CONNECTIONS,
+                max_keepalive_connections=AI_MAX_KEEPALIVE_CONNECTIONS
+            )
+        )
+        AI_CLIENTS[provider_id] = http_client
+    return http_client
+
+async def close_ai_clients():
+    clients = list(AI_CLIENTS.values())
+    AI_CLIENTS.clear()
+    await asyncio.gather(*(http_client.aclose() for http_client in clients))
+
 class AIExplanationRequest(BaseModel):
     question: str
     options: List[str]
@@ -498,6 +2150,7 @@ class AIExplanationRequest(BaseModel):
     api_key: str
     model: Optional[str] = None
     language: str = "en"
+    no_cache: bool = False
 
 class AIExplanationResponse(BaseModel):
     explanation: str
@@ -505,31 +2158,32 @@ class AIExplanationResponse(BaseModel):
     model: str
     success: bool
     error: Optional[str] = None
+    cached: bool = False
+
+AI_PROVIDERS_RESPONSE = StaticResponse([
+    {
+        "id": provider_id,
+        "name": config["name"],
+        "models": config["models"],
+        "default_model": config["default_model"]
+    }
+    for provider_id, config in AI_PROVIDERS.items()
+])
 
 @api_router.get("/ai/providers")
-async def get_ai_providers():
+async def get_ai_providers(request: Request):
     """Get list of available AI providers"""
-    return [
-        {
-            "id": provider_id,
-            "name": config["name"],
-            "models": config["models"],
-            "default_model": config["default_model"]
-        }
-        for provider_id, config in AI_PROVIDERS.items()
-    ]
+    return AI_PROVIDERS_RESPONSE.respond(request)
 
-@api_router.post("/ai/explain", response_model=AIExplanationResponse)
-async def get_ai_explanation(request: AIExplanationRequest):
-    """Get AI-powered explanation for a question"""
-    
-    if request.provider not in AI_PROVIDERS:
-        raise HTTPException(status_code=400, detail=f"Unknown provider: {request.provider}")
-    
-    provider_config = AI_PROVIDERS[request.provider]
-    model = request.model or provider_config["default_model"]
-    
-    # Build the prompt
+class AIProviderError(Exception):
+    """Non-200 answer from an AI provider"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(f"API error ({status_code}): {detail}")
+        self.status_code = status_code
+
+def build_ai_prompts(request: AIExplanationRequest) -> tuple:
+    """Return the (system, user) prompts for an explanation request"""
     lang_instruction = "Antworte auf Deutsch." if request.language == "de" else "Answer in English."
     
     options_text = "\n".join([f"{chr(65+i)}. {opt}" for i, opt in enumerate(request.options)])
@@ -557,87 +2211,280 @@ Correct Answer: {correct_letter}{user_answer_text}
 
 Provide a clear explanation of why {correct_letter} is correct. Include relevant Linux commands or concepts that help understand the topic."""
 
-    try:
-        # Handle Anthropic differently (uses messages API with different format)
-        if request.provider == "anthropic":
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    f"{provider_config['base_url']}/messages",
-                    headers={
-                        "x-api-key": request.api_key,
-                        "anthropic-version": "2023-06-01",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": model,
-                        "max_tokens": 1024,
-                        "system": system_prompt,
-                        "messages": [{"role": "user", "content": user_prompt}]
-                    }
-                )
-                
-                if response.status_code != 200:
-                    error_detail = response.text
-                    return AIExplanationResponse(
-                        explanation="",
-                        provider=request.provider,
-                        model=model,
-                        success=False,
-                        error=f"API error ({response.status_code}): {error_detail}"
-                    )
-                
-                data = response.json()
-                explanation = data["content"][0]["text"]
-                
+    return system_prompt, user_prompt
+
+def _provider_headers(provider_id: str, api_key: str) -> dict:
+    if provider_id == "anthropic":
+        return {
+            "x-api-key": api_key,
+            "anthropic-version": "2023-06-01",
+            "Content-Type": "application/json"
+        }
+    # Gemini uses different header
+    if provider_id == "gemini":
+        return {
+            "x-goog-api-key": api_key,
+            "Content-Type": "application/json"
+        }
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+
+async def request_ai_explanation(provider_id: str, model: str, api_key: str, system_prompt: str, user_prompt: str) -> str:
+    """Ask a provider for a completion and return its text"""
+    provider_config = AI_PROVIDERS[provider_id]
+    http_client = get_ai_client(provider_id)
+    headers = _provider_headers(provider_id, api_key)
+    
+    # Handle Anthropic differently (uses messages API with different format)
+    if provider_id == "anthropic":
+        response = await http_client.post(
+            f"{provider_config['base_url']}/messages",
+            headers=headers,
+            json={
+                "model": model,
+                "max_tokens": 1024,
+                "system": system_prompt,
+                "messages": [{"role": "user", "content": user_prompt}]
+            }
+        )
+        if response.status_code != 200:
+            raise AIProviderError(response.status_code, response.text)
+        return response.json()["content"][0]["text"]
+    
+    # OpenAI-compatible API (OpenAI, Gemini, DeepSeek, Qwen, Perplexity)
+    response = await http_client.post(
+        f"{provider_config['base_url']}/chat/completions",
+        headers=headers,
+        json={
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_tokens": 1024,
+            "temperature": 0.7
+        }
+    )
+    if response.status_code != 200:
+        raise AIProviderError(response.status_code, response.text)
+    return response.json()["choices"][0]["message"]["content"]
+
+async def _sse_data(response: httpx.Response):
+    """Yield the decoded JSON payload of every `data:` line of a provider stream"""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        payload = line[5:].strip()
+        if not payload or payload == "[DONE]":
+            continue
+        yield json.loads(payload)
+
+async def stream_ai_explanation(provider_id: str, model: str, api_key: str, system_prompt: str, user_prompt: str):
+    """Ask a provider for a streamed completion and yield text chunks as they arrive"""
+    provider_config = AI_PROVIDERS[provider_id]
+    http_client = get_ai_client(provider_id)
+    headers = _provider_headers(provider_id, api_key)
+    
+    if provider_id == "anthropic":
+        url = f"{provider_config['base_url']}/messages"
+        body = {
+            "model": model,
+            "max_tokens": 1024,
+            "system": system_prompt,
+            "messages": [{"role": "user", "content": user_prompt}],
+            "stream": True
+        }
+    else:
+        url = f"{provider_config['base_url']}/chat/completions"
+        body = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_tokens": 1024,
+            "temperature": 0.7,
+            "stream": True
+        }
+    
+    async with http_client.stream("POST", url, headers=headers, json=body) as response:
+        if response.status_code != 200:
+            await response.aread()
+            raise AIProviderError(response.status_code, response.text)
+        async for event in _sse_data(response):
+            if provider_id == "anthropic":
+                if event.get("type") == "content_block_delta":
+                    text = event["delta"].get("text", "")
+                elif event.get("type") == "error":
+                    raise AIProviderError(response.status_code, json.dumps(event.get("error")))
+                else:
+                    continue
+            else:
+                choices = event.get("choices") or [{}]
+                text = (choices[0].get("delta") or {}).get("content") or ""
+            if text:
+                yield text
+
+class LatencyWindow:
+    """Percentiles over the most recent latency samples, in milliseconds"""
+
+    def __init__(self, size: int = 500):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, ms: float):
+        self.samples.append(ms)
+        self.count += 1
+
+    def stats(self) -> dict:
+        ordered = sorted(self.samples)
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1) if ordered else None
+        return {"count": self.count, "p50_ms": pct(0.5), "p95_ms": pct(0.95)}
+
+STREAM_TTFT = LatencyWindow()
+
+class ExplanationCache:
+    """Two-tier cache for AI explanations keyed by a hash of provider, model and prompt.
+
+    The in-process LRU answers repeat requests without any I/O; the Mongo
+    tier (ai_explanations, expired by a TTL index) survives restarts and is
+    shared between workers.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.memory = TTLCache(maxsize, ttl)
+        self.db_hits = 0
+
+    @staticmethod
+    def key(provider_id: str, model: str, system_prompt: str, user_prompt: str) -> str:
+        material = json.dumps([provider_id, model, system_prompt, user_prompt], ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        explanation = self.memory.get(key)
+        if explanation is not None:
+            return explanation
+        try:
+            doc = await db.ai_explanations.find_one({"key": key}, {"_id": 0, "explanation": 1})
+        except PyMongoError as e:
+            logger.warning(f"AI explanation cache lookup failed: {e}")
+            return None
+        if doc is None:
+            return None
+        self.db_hits += 1
+        self.memory.set(key, doc["explanation"])
+        return doc["explanation"]
+
+    async def set(self, key: str, explanation: str):
+        self.memory.set(key, explanation)
+        try:
+            await db.ai_explanations.update_one(
+                {"key": key},
+                {"$set": {"explanation": explanation, "created_at": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+        except PyMongoError as e:
+            logger.warning(f"AI explanation cache write failed: {e}")
+            return
+        # Other workers may hold an older explanation for this key (no_cache refreshes)
+        await CACHE_BUS.publish("ai_explanation", key)
+
+    def invalidate(self, key: Optional[str]):
+        if key is None:
+            self.memory.clear()
         else:
-            # OpenAI-compatible API (OpenAI, Gemini, DeepSeek, Qwen, Perplexity)
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                headers = {
-                    "Authorization": f"Bearer {request.api_key}",
-                    "Content-Type": "application/json"
-                }
-                
-                # Gemini uses different header
-                if request.provider == "gemini":
-                    headers = {
-                        "x-goog-api-key": request.api_key,
-                        "Content-Type": "application/json"
-                    }
-                
-                response = await client.post(
-                    f"{provider_config['base_url']}/chat/completions",
-                    headers=headers,
-                    json={
-                        "model": model,
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        "max_tokens": 1024,
-                        "temperature": 0.7
-                    }
-                )
-                
-                if response.status_code != 200:
-                    error_detail = response.text
-                    return AIExplanationResponse(
-                        explanation="",
-                        provider=request.provider,
-                        model=model,
-                        success=False,
-                        error=f"API error ({response.status_code}): {error_detail}"
-                    )
-                
-                data = response.json()
-                explanation = data["choices"][0]["message"]["content"]
+            self.memory.invalidate(key)
+
+    def stats(self) -> dict:
+        return {**self.memory.stats(), "db_hits": self.db_hits}
+
+EXPLANATION_CACHE = ExplanationCache(AI_CACHE_SIZE, AI_CACHE_TTL)
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one upstream call.
+
+    Only successful results are shared. If the leading call fails, every
+    waiter retries with its own call, since the failure may be specific to
+    the leader (e.g. an invalid API key).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn):
+        call = self._calls.get(key)
+        if call is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            call = self._calls[key] = {"task": task, "waiters": 0}
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+            # Shield so a disconnecting client does not cancel the shared call
+            return await asyncio.shield(task)
         
+        self.coalesced += 1
+        call["waiters"] += 1
+        try:
+            return await asyncio.shield(call["task"])
+        except Exception:
+            return await fn()
+        finally:
+            call["waiters"] -= 1
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "waiters": {key[:12]: call["waiters"] for key, call in self._calls.items() if call["waiters"]},
+        }
+
+AI_SINGLE_FLIGHT = SingleFlight()
+
+@api_router.post("/ai/explain", response_model=AIExplanationResponse)
+async def get_ai_explanation(request: AIExplanationRequest):
+    """Get AI-powered explanation for a question"""
+    
+    if request.provider not in AI_PROVIDERS:
+        raise HTTPException(status_code=400, detail=f"Unknown provider: {request.provider}")
+    
+    provider_config = AI_PROVIDERS[request.provider]
+    model = request.model or provider_config["default_model"]
+    system_prompt, user_prompt = build_ai_prompts(request)
+    
+    use_cache = AI_CACHE_ENABLED and not request.no_cache
+    cache_key = ExplanationCache.key(request.provider, model, system_prompt, user_prompt)
+    if use_cache:
+        cached = await EXPLANATION_CACHE.get(cache_key)
+        if cached is not None:
+            return AIExplanationResponse(
+                explanation=cached,
+                provider=request.provider,
+                model=model,
+                success=True,
+                cached=True
+            )
+    
+    async def fetch():
+        explanation = await request_ai_explanation(request.provider, model, request.api_key, system_prompt, user_prompt)
+        if use_cache:
+            await EXPLANATION_CACHE.set(cache_key, explanation)
+        return explanation
+    
+    try:
+        explanation = await AI_SINGLE_FLIGHT.do(cache_key, fetch)
+    except AIProviderError as e:
         return AIExplanationResponse(
-            explanation=explanation,
+            explanation="",
             provider=request.provider,
             model=model,
-            success=True
+            success=False,
+            error=str(e)
         )
-        
     except httpx.TimeoutException:
         return AIExplanationResponse(
             explanation="",
@@ -655,6 +2502,267 @@ Provide a clear explanation of why {correct_letter} is correct. Include relevant
             success=False,
             error=str(e)
         )
+    
+    return AIExplanationResponse(
+        explanation=explanation,
+        provider=request.provider,
+        model=model,
+        success=True
+    )
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@api_router.post("/ai/explain/stream")
+async def stream_ai_explanation_route(request: AIExplanationRequest):
+    """Stream an AI explanation to the client as Server-Sent Events.
+
+    Emits `delta` events with text chunks, then a single `done` event (with
+    time-to-first-token) or an `error` event.
+    """
+    if request.provider not in AI_PROVIDERS:
+        raise HTTPException(status_code=400, detail=f"Unknown provider: {request.provider}")
+    
+    model = request.model or AI_PROVIDERS[request.provider]["default_model"]
+    system_prompt, user_prompt = build_ai_prompts(request)
+    use_cache = AI_CACHE_ENABLED and not request.no_cache
+    cache_key = ExplanationCache.key(request.provider, model, system_prompt, user_prompt)
+    
+    async def events():
+        started = time.perf_counter()
+        meta = {"provider": request.provider, "model": model}
+        if use_cache:
+            cached = await EXPLANATION_CACHE.get(cache_key)
+            if cached is not None:
+                yield _sse_event("delta", {"text": cached})
+                yield _sse_event("done", {**meta, "cached": True, "ttft_ms": 0.0})
+                return
+        
+        chunks = []
+        ttft_ms = None
+        try:
+            async for text in stream_ai_explanation(request.provider, model, request.api_key, system_prompt, user_prompt):
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                    STREAM_TTFT.add(ttft_ms)
+                chunks.append(text)
+                yield _sse_event("delta", {"text": text})
+        except httpx.TimeoutException:
+            yield _sse_event("error", {**meta, "error": "Request timed out. Please try again."})
+            return
+        except Exception as e:
+            logger.error(f"AI explanation stream error: {str(e)}")
+            yield _sse_event("error", {**meta, "error": str(e)})
+            return
+        
+        if use_cache and chunks:
+            await EXPLANATION_CACHE.set(cache_key, "".join(chunks))
+        yield _sse_event("done", {**meta, "cached": False, "ttft_ms": round(ttft_ms or 0.0, 1)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# ============ BOOTSTRAP ============
+
+# Pre-serialized sections; a page load is answered by splicing them together
+BOOTSTRAP_SECTIONS = {
+    "chapters": CHAPTERS_RESPONSE.body,
+    "providers": AI_PROVIDERS_RESPONSE.body,
+    # Content hash of the study plan. /studyplan ETags are this hash plus a suffix
+    # per encoding, so compare it with the cached copy's hash, or send it quoted
+    # as If-None-Match: /studyplan answers 304 for any of its variants
+    "study_plan_version": json.dumps(STUDY_PLAN_RESPONSE.etag.strip('"')).encode(),
+}
+
+def bootstrap_body(sections: dict) -> bytes:
+    return b"{" + b",".join(f'"{name}":'.encode() + body for name, body in sections.items()) + b"}"
+
+# Without questions the response depends only on the flags, so every
+# combination is a StaticResponse built (and gzipped) once
+BOOTSTRAP_RESPONSES = LazyMapping(
+    [(c, p, s) for c in (True, False) for p in (True, False) for s in (True, False)],
+    lambda flags: StaticResponse(bootstrap_body(
+        {name: body for name, body, included in zip(BOOTSTRAP_SECTIONS, BOOTSTRAP_SECTIONS.values(), flags) if included}
+    ))
+)
+
+@api_router.get("/bootstrap")
+async def get_bootstrap(
+    request: Request,
+    chapters: bool = True,
+    providers: bool = True,
+    study_plan: bool = True,
+    chapter: Optional[int] = None,
+    limit: int = 10,
+    mode: Literal["random", "adaptive"] = "random",
+    user = Depends(get_current_user)
+):
+    """Everything a page needs on load in one response.
+
+    Sections are switched off with chapters/providers/study_plan=false;
+    passing a chapter adds a first question batch as from /questions/{chapter}.
+    """
+    flags = (chapters, providers, study_plan)
+    if chapter is None:
+        return BOOTSTRAP_RESPONSES[flags].respond(request)
+    
+    sections = {name: body for name, body, included in zip(BOOTSTRAP_SECTIONS, BOOTSTRAP_SECTIONS.values(), flags) if included}
+    questions = await select_questions(chapter, limit, mode, user)
+    sections["questions"] = json.dumps(questions, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return Response(content=bootstrap_body(sections), media_type="application/json", headers={"Cache-Control": "no-store"})
+
+# ============ ADMIN EXPORT ============
+
+CHAPTER_TITLES = {c["id"]: c["title"] for c in CHAPTERS}
+
+# collection -> (watermark field, watermark type, tie-breaker field, output columns)
+# Quiz results resume on sync_ms, the server time they were stored: attempts synced
+# from offline clients keep their older completed_at but still sort after the
+# previous run's watermark.
+EXPORTS = {
+    "quiz_results": (
+        "sync_ms", int, "id",
+        ["id", "user_id", "email", "name", "chapter", "chapter_title", "score", "total", "percentage", "completed_at",
+         "sync_ms"]
+    ),
+    "progress": (
+        "last_activity", str, "user_id",
+        ["user_id", "email", "name", "total_quizzes", "total_correct", "total_questions", "chapters_completed",
+         "current_week", "streak_days", "last_activity", "flashcards_reviewed"]
+    ),
+}
+
+async def _join_users(database, batch: List[dict], users: TTLCache) -> List[dict]:
+    missing = {doc["user_id"] for doc in batch if users.get(doc["user_id"]) is None}
+    if missing:
+        async for user in database.users.find({"id": {"$in": list(missing)}}, {"_id": 0, "id": 1, "email": 1, "name": 1}):
+            users.set(user["id"], user)
+    rows = []
+    for doc in batch:
+        user = users.get(doc["user_id"]) or {}
+        row = {**doc, "email": user.get("email", ""), "name": user.get("name", "")}
+        if "chapter" in doc:
+            row["chapter_title"] = CHAPTER_TITLES.get(doc["chapter"], "")
+        rows.append(row)
+    return rows
+
+def parse_watermark(collection: str, since: Optional[str]):
+    """Parse a `since` argument into (watermark, tie-breaker); raises ValueError.
+
+    The full form is "<watermark>,<tie-breaker>" as printed by format_watermark.
+    A bare watermark resumes after every row with that value.
+    """
+    if not since:
+        return None
+    value, _, after = since.partition(",")
+    return EXPORTS[collection][1](value), after or None
+
+def format_watermark(collection: str, row: dict) -> str:
+    watermark, _, tie_breaker, _ = EXPORTS[collection]
+    return f"{row.get(watermark)},{row.get(tie_breaker)}"
+
+async def export_rows(database, collection: str, since=None):
+    """Yield export rows for `collection` in watermark order, joined with user data.
+
+    Reads in EXPORT_BATCH_SIZE batches and only keeps one batch plus a
+    bounded user cache in memory. `since` resumes after a previous run's
+    last (watermark, tie-breaker) pair (see parse_watermark); the tie-breaker
+    matters because one sync stamps hundreds of attempts with the same sync_ms.
+    """
+    watermark, _, tie_breaker, columns = EXPORTS[collection]
+    query = {}
+    if since is not None:
+        value, after = since
+        query = {watermark: {"$gt": value}}
+        if after is not None:
+            query = {"$or": [{watermark: {"$gt": value}}, {watermark: value, tie_breaker: {"$gt": after}}]}
+    if watermark == "sync_ms":
+        # A sync stamps its attempts with the time it started, so attempts from a
+        # sync still in flight can land behind the newest stamps; leave those for
+        # the next run. Documents stored before sync_ms existed match $not and sort first.
+        cutoff = int(time.time() * 1000) - SYNC_OVERLAP_MS
+        query[watermark] = {**query.get(watermark, {}), "$not": {"$gt": cutoff}}
+    projection = {"_id": 0, **{c: 1 for c in columns if c not in ("email", "name", "chapter_title")}}
+    cursor = database[collection].find(query, projection).sort([(watermark, ASCENDING), (tie_breaker, ASCENDING)])
+    cursor = cursor.batch_size(EXPORT_BATCH_SIZE)
+    users = TTLCache(EXPORT_BATCH_SIZE * 4, 3600)
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            for row in await _join_users(database, batch, users):
+                yield row
+            batch = []
+    if batch:
+        for row in await _join_users(database, batch, users):
+            yield row
+
+def format_ndjson(row: dict, columns: List[str]) -> str:
+    return json.dumps({c: row.get(c) for c in columns}, ensure_ascii=False) + "\n"
+
+def format_csv(row: Optional[dict], columns: List[str]) -> str:
+    """One CSV line; row=None gives the header"""
+    buffer = io.StringIO()
+    if row is None:
+        values = columns
+    else:
+        values = [";".join(map(str, v)) if isinstance(v, list) else v for v in (row.get(c, "") for c in columns)]
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    if not ADMIN_TOKEN or not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@api_router.get("/admin/export", dependencies=[Depends(require_admin)])
+async def export_data(
+    collection: Literal["quiz_results", "progress"] = "quiz_results",
+    format: Literal["ndjson", "csv"] = "ndjson",
+    since: Optional[str] = None
+):
+    """Stream all quiz results or progress documents as NDJSON or CSV.
+
+    Rows are ordered by (sync_ms, id) for quiz_results or
+    (last_activity, user_id) for progress; pass the last pair seen as
+    `since`, e.g. "1769896800000,<id>", to resume.
+    """
+    columns = EXPORTS[collection][3]
+    try:
+        watermark = parse_watermark(collection, since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid watermark for {collection}: {since}")
+    
+    async def body():
+        if format == "csv":
+            yield format_csv(None, columns)
+        async for row in export_rows(db, collection, watermark):
+            yield format_ndjson(row, columns) if format == "ndjson" else format_csv(row, columns)
+    
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{collection}.{format}"'}
+    )
+
+# ============ METRICS ============
+
+@api_router.get("/metrics")
+async def get_metrics():
+    """Runtime counters for sizing worker pools and caches"""
+    return {
+        "password_hashing": PASSWORD_HASHER.stats(),
+        "token_cache": TOKEN_CACHE.stats(),
+        "user_cache": USER_CACHE.stats(),
+        "ai_explanation_cache": EXPLANATION_CACHE.stats(),
+        "ai_stream_ttft": STREAM_TTFT.stats(),
+        "ai_single_flight": AI_SINGLE_FLIGHT.stats(),
+        "content": CONTENT_STORE.stats(),
+        "cache_bus": CACHE_BUS.stats(),
+    }
 
 @api_router.get("/")
 async def root():
@@ -671,11 +2779,64 @@ app.add_middleware(
     allow_origins=cors_origins or ["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Content-Version"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ContentVersionMiddleware)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_db_indexes():
+    try:
+        await ensure_indexes(db)
+    except PyMongoError as e:
+        logger.error(f"Could not create MongoDB indexes: {e}")
+        return
+    if CHECK_QUERY_PLANS:
+        problems = await check_query_plans(db)
+        if problems:
+            raise RuntimeError("Unindexed hot queries: " + "; ".join(problems))
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
+
+@app.on_event("startup")
+async def open_ai_clients():
+    for provider_id in AI_PROVIDERS:
+        get_ai_client(provider_id)
+
+@app.on_event("shutdown")
+async def shutdown_ai_clients():
+    await close_ai_clients()
+
+@app.on_event("startup")
+async def start_content_watcher():
+    if CONTENT_RELOAD_INTERVAL > 0:
+        app.state.content_watcher = asyncio.create_task(CONTENT_STORE.watch(CONTENT_RELOAD_INTERVAL))
+
+@app.on_event("shutdown")
+async def stop_content_watcher():
+    watcher = getattr(app.state, "content_watcher", None)
+    if watcher:
+        watcher.cancel()
+
+@app.on_event("startup")
+async def start_cache_bus():
+    CACHE_BUS.on("user", lambda user_id: USER_CACHE.clear() if user_id is None else USER_CACHE.invalidate(user_id))
+    CACHE_BUS.on("ai_explanation", EXPLANATION_CACHE.invalidate)
+    CACHE_BUS.on("content", lambda version: CONTENT_STORE.refresh())
+    if CACHE_BUS.enabled:
+        app.state.cache_bus = asyncio.create_task(CACHE_BUS.listen())
+
+@app.on_event("shutdown")
+async def stop_cache_bus():
+    listener = getattr(app.state, "cache_bus", None)
+    if listener:
+        listener.cancel()
+
+@app.on_event("shutdown")
+async def shutdown_password_hasher():
+    PASSWORD_HASHER.shutdown()
@@ -27,7 +27,7 @@ echo "[3/3] Installiere Pakete..."
 if [ -f "requirements-minimal.txt" ]; then
   pip install -q -r requirements-minimal.txt
 else
-  pip install -q fastapi uvicorn motor pymongo python-dotenv pydantic PyJWT httpx requests
+  pip install -q fastapi uvicorn motor pymongo python-dotenv pydantic PyJWT httpx orjson requests
 fi
 
 if [ ! -f ".env" ]; then
@@ -38,11 +38,19 @@ if [ ! -f ".env" ]; then
   } > .env
 fi
 
+# A fixed secret keeps logins valid across restarts and is required for several workers
+if ! grep -q '^JWT_SECRET=' .env; then
+  echo "JWT_SECRET=$(python3 -c 'import secrets; print(secrets.token_hex(32))')" >> .env
+fi
+
+# Worker processes, e.g. WEB_CONCURRENCY=4 ./start-linux.sh
+WORKERS="${WEB_CONCURRENCY:-1}"
+
 echo ""
 echo "========================================"
-echo "  Backend startet auf Port 8001"
+echo "  Backend startet auf Port 8001 ($WORKERS Worker)"
 echo "  Druecke Ctrl+C zum Beenden"
 echo "========================================"
 echo ""
 
-uvicorn server:app --host 0.0.0.0 --port 8001
+uvicorn server:app --host 0.0.0.0 --port 8001 --workers "$WORKERS"
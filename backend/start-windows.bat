@@ -28,7 +28,7 @@ call venv\Scripts\activate.bat
 
 :: Pakete installieren
 echo [3/3] Installiere Pakete...
-pip install -q fastapi uvicorn motor pymongo python-dotenv pydantic PyJWT httpx
+pip install -q fastapi uvicorn motor pymongo python-dotenv pydantic PyJWT httpx orjson tzdata
 
 :: .env erstellen falls nicht vorhanden
 if not exist ".env" (
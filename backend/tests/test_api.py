@@ -5,9 +5,19 @@ Tests: Chapters, Questions, Flashcards, AI Providers, Study Plan
 import pytest
 import requests
 import os
+import uuid
+from datetime import datetime, timedelta, timezone
 
 BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
 
+def register_user():
+    """Register a fresh user and return its auth headers"""
+    response = requests.post(f"{BASE_URL}/api/auth/register", json={
+        "email": f"test_{uuid.uuid4().hex[:12]}@test.com", "password": "test1234", "name": "Test User"
+    })
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
 class TestHealthAndBasicEndpoints:
     """Test basic API health and root endpoints"""
     
@@ -42,6 +52,20 @@ class TestChaptersEndpoint:
         
         print(f"✓ Chapters endpoint returns {len(data)} chapters with correct structure")
 
+    def test_chapters_etag_revalidation(self):
+        """Test static catalog answers If-None-Match with 304"""
+        response = requests.get(f"{BASE_URL}/api/chapters")
+        assert response.status_code == 200
+        etag = response.headers.get("ETag")
+        assert etag, "Static catalog responses should carry an ETag"
+        assert "Cache-Control" in response.headers
+
+        response = requests.get(f"{BASE_URL}/api/chapters", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers.get("ETag") == etag
+
+        print(f"✓ Chapters endpoint revalidates with ETag {etag}")
+
 class TestQuestionsEndpoint:
     """Test /api/questions/{chapter} endpoint"""
     
@@ -64,6 +88,18 @@ class TestQuestionsEndpoint:
             assert len(q["options"]) == 4, "Each question should have 4 options"
         
         print(f"✓ Chapter 1 questions endpoint returns {len(data)} questions")
+
+    def test_questions_content_version_header(self):
+        """Test responses carry the question bank version"""
+        response = requests.get(f"{BASE_URL}/api/questions/1?limit=1")
+        assert response.status_code == 200
+        version = response.headers.get("X-Content-Version")
+        assert version
+        
+        metrics = requests.get(f"{BASE_URL}/api/metrics").json()
+        assert metrics["content"]["version"] == version
+        
+        print(f"✓ Content version header: {version}")
     
     def test_get_questions_all_chapters(self):
         """Test questions for all 5 chapters"""
@@ -75,6 +111,36 @@ class TestQuestionsEndpoint:
             assert len(data) > 0, f"Chapter {chapter} should have questions"
             print(f"✓ Chapter {chapter} has {len(data)} questions")
     
+    def test_questions_are_distinct_and_from_chapter(self):
+        """Test sampled questions are unique and belong to the requested chapter"""
+        response = requests.get(f"{BASE_URL}/api/questions/2?limit=5")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 5
+        assert len({q["id"] for q in data}) == 5, "Sampled questions should not repeat"
+        for q in data:
+            assert q["chapter"] == 2
+
+        # Unknown chapters return an empty list
+        response = requests.get(f"{BASE_URL}/api/questions/99")
+        assert response.status_code == 200
+        assert response.json() == []
+
+        print(f"✓ Chapter 2 sampling returns {len(data)} distinct questions")
+
+    def test_adaptive_mode_without_auth(self):
+        """Test adaptive mode falls back to uniform sampling for anonymous users"""
+        response = requests.get(f"{BASE_URL}/api/questions/3?limit=5&mode=adaptive")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 5
+        assert all(q["chapter"] == 3 for q in data)
+
+        response = requests.get(f"{BASE_URL}/api/questions/3?mode=unknown")
+        assert response.status_code == 422
+
+        print(f"✓ Adaptive mode returns {len(data)} questions without auth")
+
     def test_extended_questions_count(self):
         """Test that extended questions are included (100+ total)"""
         total_questions = 0
@@ -88,6 +154,322 @@ class TestQuestionsEndpoint:
         assert total_questions >= 50, f"Expected 50+ questions, got {total_questions}"
         print(f"✓ Total questions across all chapters: {total_questions}")
 
+class TestBootstrapEndpoint:
+    """Test /api/bootstrap endpoint"""
+
+    def test_bootstrap_sections(self):
+        """Test bootstrap bundles chapters, providers and a question batch"""
+        response = requests.get(f"{BASE_URL}/api/bootstrap?chapter=1&limit=5&study_plan=false")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["chapters"]) == 5
+        assert len(data["providers"]) >= 1
+        assert "study_plan_version" not in data
+        assert len(data["questions"]) == 5
+        assert all(q["chapter"] == 1 for q in data["questions"])
+
+        response = requests.get(f"{BASE_URL}/api/bootstrap?providers=false")
+        data = response.json()
+        assert "providers" not in data and "questions" not in data
+        assert response.headers.get("ETag")
+
+        # The study plan version revalidates the cached plan whatever its encoding
+        headers = {"Accept-Encoding": "gzip", "If-None-Match": f'"{data["study_plan_version"]}"'}
+        response = requests.get(f"{BASE_URL}/api/studyplan", headers=headers)
+        assert response.status_code == 304
+
+        print(f"✓ Bootstrap returns sections: {list(data)}")
+
+
+class TestExamEndpoint:
+    """Test /api/exam endpoints"""
+
+    def test_exam_requires_auth(self):
+        """Test exam simulation endpoints require authentication"""
+        response = requests.post(f"{BASE_URL}/api/exam/start")
+        assert response.status_code == 401
+
+        response = requests.post(f"{BASE_URL}/api/exam/unknown/submit", json={"answers": [0, 1]})
+        assert response.status_code == 401
+
+        print(f"✓ Exam endpoints require authentication")
+
+    def test_exam_allocation_follows_chapter_weights(self):
+        """Test the exam draws questions per chapter in proportion to the exam weights"""
+        headers = register_user()
+        weights = {c["id"]: float(c["weight"].rstrip("%")) for c in requests.get(f"{BASE_URL}/api/chapters").json()}
+        response = requests.post(f"{BASE_URL}/api/exam/start?seed=42", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        questions = data["questions"]
+        assert len({q["id"] for q in questions}) == len(questions)
+        assert all("correct_answer" not in q for q in questions)
+        
+        count = len(questions)
+        for chapter, weight in weights.items():
+            share = count * weight / sum(weights.values())
+            assert abs(sum(q["chapter"] == chapter for q in questions) - share) < 1
+        
+        # The same seed gives the same exam
+        again = requests.post(f"{BASE_URL}/api/exam/start?seed=42", headers=headers).json()
+        assert [q["id"] for q in again["questions"]] == [q["id"] for q in questions]
+        
+        print(f"✓ Exam allocates {count} questions by chapter weight")
+
+    def test_exam_submit_once(self):
+        """Test an exam is scored once; a second submission is rejected"""
+        headers = register_user()
+        exam = requests.post(f"{BASE_URL}/api/exam/start", headers=headers).json()
+        answers = [0] * len(exam["questions"])
+        
+        response = requests.post(f"{BASE_URL}/api/exam/{exam['id']}/submit", json={"answers": answers}, headers=headers)
+        if exam["duration_minutes"] > 0:
+            assert response.status_code == 200
+            data = response.json()
+            assert data["total"] == len(answers) and data["unanswered"] == 0
+            assert sum(c["total"] for c in data["chapters"]) == len(answers)
+        
+        response = requests.post(f"{BASE_URL}/api/exam/{exam['id']}/submit", json={"answers": answers}, headers=headers)
+        assert response.status_code == 404
+        
+        print(f"✓ Exam can only be submitted once")
+
+    def test_exam_expires(self):
+        """Test late submissions are rejected (server started with EXAM_DURATION_MINUTES=0, EXAM_GRACE_SECONDS=0)"""
+        headers = register_user()
+        exam = requests.post(f"{BASE_URL}/api/exam/start", headers=headers).json()
+        if exam["duration_minutes"] > 0:
+            pytest.skip("needs a server started with EXAM_DURATION_MINUTES=0 and EXAM_GRACE_SECONDS=0")
+        
+        response = requests.post(f"{BASE_URL}/api/exam/{exam['id']}/submit", json={"answers": []}, headers=headers)
+        assert response.status_code == 409
+        
+        print(f"✓ Expired exams are rejected")
+
+class TestProgressEndpoint:
+    """Test /api/progress endpoints"""
+
+    def test_progress_requires_auth(self):
+        """Test progress, activity and history endpoints require authentication"""
+        response = requests.get(f"{BASE_URL}/api/progress")
+        assert response.status_code == 401
+
+        response = requests.get(f"{BASE_URL}/api/progress/activity?days=30")
+        assert response.status_code == 401
+
+        response = requests.get(f"{BASE_URL}/api/quiz/history?limit=5")
+        assert response.status_code == 401
+
+        response = requests.post(f"{BASE_URL}/api/sync", json={"quiz_attempts": []})
+        assert response.status_code == 401
+
+        print(f"✓ Progress endpoints require authentication")
+
+    def test_progress_chapter_stats_and_slim_history(self):
+        """Test per-chapter aggregates are kept on submit and history omits answers"""
+        headers = register_user()
+        questions = requests.get(f"{BASE_URL}/api/questions/1?limit=4").json()
+        passed = [{"question_id": q["id"], "selected_answer": q["correct_answer"]} for q in questions]
+        failed = [{"question_id": q["id"], "selected_answer": (q["correct_answer"] + 1) % 4} for q in questions]
+        for answers in (passed, failed):
+            assert requests.post(f"{BASE_URL}/api/quiz/submit?chapter=1", json=answers, headers=headers).status_code == 200
+        
+        response = requests.get(f"{BASE_URL}/api/progress", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        stats = data["chapter_stats"]["1"]
+        assert stats["attempts"] == 2
+        assert stats["best"] == 100.0 and stats["last"] == 0.0 and stats["average"] == 50.0
+        assert stats["streak"] == 0
+        assert len(data["quiz_history"]) == 2
+        assert all("answers" not in item for item in data["quiz_history"])
+        
+        print(f"✓ Chapter stats: {stats}")
+
+    def test_activity_uses_user_timezone(self):
+        """Test a quiz marks the current day in the user's timezone and starts a streak"""
+        headers = register_user()
+        response = requests.put(f"{BASE_URL}/api/auth/timezone?tz=Mars/Olympus_Mons", headers=headers)
+        assert response.status_code == 400
+        response = requests.put(f"{BASE_URL}/api/auth/timezone?tz=UTC", headers=headers)
+        assert response.status_code == 200
+        response = requests.put(f"{BASE_URL}/api/auth/timezone?tz=Pacific/Kiritimati", headers=headers)
+        assert response.status_code == 200
+        assert requests.get(f"{BASE_URL}/api/auth/me", headers=headers).json()["timezone"] == "Pacific/Kiritimati"
+        
+        questions = requests.get(f"{BASE_URL}/api/questions/1?limit=3").json()
+        answers = [{"question_id": q["id"], "selected_answer": q["correct_answer"]} for q in questions]
+        assert requests.post(f"{BASE_URL}/api/quiz/submit?chapter=1", json=answers, headers=headers).status_code == 200
+        
+        response = requests.get(f"{BASE_URL}/api/progress/activity?days=7", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        # UTC+14: the local day is usually ahead of the UTC day
+        today = datetime.now(timezone(timedelta(hours=14))).date().isoformat()
+        assert data["timezone"] == "Pacific/Kiritimati"
+        assert data["active_days"] == [today] and data["to"] == today
+        assert data["streak_days"] == 1
+        
+        print(f"✓ Activity recorded for {today} in {data['timezone']}")
+
+    def test_quiz_history_cursor_paging(self):
+        """Test history pages cover every attempt once, newest first, also across equal timestamps"""
+        headers = register_user()
+        base = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(days=1)
+        # Three attempts share one completed_at, so paging must break ties on the id
+        moments = [base, base, base, base - timedelta(hours=1), base - timedelta(hours=2)]
+        attempts = [
+            {"client_id": f"h{i}", "chapter": 1 + i % 2, "completed_at": moment.isoformat(), "score": i, "total": 5}
+            for i, moment in enumerate(moments)
+        ]
+        assert requests.post(f"{BASE_URL}/api/sync", json={"quiz_attempts": attempts}, headers=headers).status_code == 200
+        
+        items, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 2, "fields": "id,completed_at"}
+            if cursor:
+                params["cursor"] = cursor
+            response = requests.get(f"{BASE_URL}/api/quiz/history", params=params, headers=headers)
+            assert response.status_code == 200
+            data = response.json()
+            assert all(set(item) == {"id", "completed_at"} for item in data["items"])
+            items += data["items"]
+            pages += 1
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        
+        assert pages == 3 and len(items) == 5
+        assert len({item["id"] for item in items}) == 5
+        keys = [(item["completed_at"], item["id"]) for item in items]
+        assert keys == sorted(keys, reverse=True)
+        
+        data = requests.get(f"{BASE_URL}/api/quiz/history?chapter=2", headers=headers).json()
+        assert len(data["items"]) == 2 and all(item["chapter"] == 2 for item in data["items"])
+        response = requests.get(f"{BASE_URL}/api/quiz/history?fields=password", headers=headers)
+        assert response.status_code == 400
+        
+        print(f"✓ Quiz history paged through {len(items)} attempts in {pages} pages")
+
+class TestSyncEndpoint:
+    """Test /api/sync offline merge"""
+
+    def test_replayed_attempts_count_once(self):
+        """Test sending the same offline attempt twice stores it once and counts its study day"""
+        headers = register_user()
+        questions = requests.get(f"{BASE_URL}/api/questions/1?limit=2").json()
+        yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+        attempt = {
+            "client_id": "offline-1", "chapter": 1, "completed_at": yesterday.isoformat(),
+            "answers": [{"question_id": q["id"], "selected_answer": q["correct_answer"]} for q in questions]
+        }
+        
+        first = requests.post(f"{BASE_URL}/api/sync", json={"quiz_attempts": [attempt]}, headers=headers)
+        assert first.status_code == 200
+        assert first.json()["applied"]["quiz_attempts"] == 1
+        second = requests.post(f"{BASE_URL}/api/sync", json={"quiz_attempts": [attempt]}, headers=headers).json()
+        assert second["applied"]["quiz_attempts"] == 0
+        assert second["progress"]["total_quizzes"] == 1 and second["progress"]["total_correct"] == 2
+        
+        # Online quiz today continues the streak started by the offline attempt
+        answers = [{"question_id": q["id"], "selected_answer": q["correct_answer"]} for q in questions]
+        requests.post(f"{BASE_URL}/api/quiz/submit?chapter=1", json=answers, headers=headers)
+        activity = requests.get(f"{BASE_URL}/api/progress/activity?days=7", headers=headers).json()
+        assert len(activity["active_days"]) == 2 and activity["streak_days"] == 2
+        
+        print(f"✓ Replayed attempt counted once, streak {activity['streak_days']}")
+
+    def test_card_states_last_writer_wins(self):
+        """Test card states merge on the review time; ties keep the server state"""
+        headers = register_user()
+        card_id = requests.get(f"{BASE_URL}/api/flashcards/1").json()[0]["id"]
+        reviewed_at = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(hours=2)
+        
+        def sync_card(moment, interval):
+            state = {"card_id": card_id, "reviewed_at": moment.isoformat(), "interval_days": interval}
+            response = requests.post(f"{BASE_URL}/api/sync", json={"cards": [state]}, headers=headers)
+            assert response.status_code == 200
+            return response.json()
+        
+        assert sync_card(reviewed_at, 3)["applied"]["cards"] == 1
+        assert sync_card(reviewed_at, 10)["applied"]["cards"] == 0
+        # The losing client gets the winning state back
+        lost = sync_card(reviewed_at - timedelta(hours=1), 10)
+        assert lost["applied"]["cards"] == 0
+        assert [(c["card_id"], c["interval_days"]) for c in lost["cards"]] == [(card_id, 3)]
+        assert sync_card(reviewed_at + timedelta(hours=1), 4)["applied"]["cards"] == 1
+        
+        cards = requests.post(f"{BASE_URL}/api/sync", json={}, headers=headers).json()["cards"]
+        assert [(c["card_id"], c["interval_days"]) for c in cards] == [(card_id, 4)]
+        
+        print(f"✓ Card states merge last-writer-wins")
+
+    def test_server_week_change_wins_over_older_offline_change(self):
+        """Test PUT /progress/week is reported by /sync and beats older offline week changes"""
+        headers = register_user()
+        token = requests.post(f"{BASE_URL}/api/sync", json={}, headers=headers).json()["token"]
+        requests.put(f"{BASE_URL}/api/progress/week?week=7", headers=headers)
+        
+        data = requests.post(f"{BASE_URL}/api/sync", json={"token": token}, headers=headers).json()
+        assert data["current_week"] == 7
+        
+        stale = {"week": 2, "changed_at": "2020-01-01T00:00:00Z"}
+        data = requests.post(f"{BASE_URL}/api/sync", json={"token": data["token"], "current_week": stale}, headers=headers).json()
+        assert data["applied"]["current_week"] is False
+        assert data["current_week"] == 7
+        
+        print(f"✓ Server week change wins over an older offline change")
+
+    def test_token_returns_changes_since_last_sync(self):
+        """Test a token returns server-side changes made after it, and rejects garbage"""
+        headers = register_user()
+        token = requests.post(f"{BASE_URL}/api/sync", json={}, headers=headers).json()["token"]
+        
+        questions = requests.get(f"{BASE_URL}/api/questions/2?limit=2").json()
+        answers = [{"question_id": q["id"], "selected_answer": q["correct_answer"]} for q in questions]
+        quiz_id = requests.post(f"{BASE_URL}/api/quiz/submit?chapter=2", json=answers, headers=headers).json()["id"]
+        
+        data = requests.post(f"{BASE_URL}/api/sync", json={"token": token}, headers=headers).json()
+        assert [a["id"] for a in data["quiz_attempts"]] == [quiz_id]
+        assert data["has_more"] is False
+        
+        # Resyncing right away repeats recent changes (overlap), which merge idempotently
+        again = requests.post(f"{BASE_URL}/api/sync", json={"token": data["token"]}, headers=headers).json()
+        assert quiz_id in [a["id"] for a in again["quiz_attempts"]]
+        
+        response = requests.post(f"{BASE_URL}/api/sync", json={"token": "not-a-token"}, headers=headers)
+        assert response.status_code == 400
+        
+        print(f"✓ Sync token returns changes since the last sync")
+
+    def test_has_more_pages_through_large_backlogs(self):
+        """Test more changes than fit in one response are paged without gaps or repeats"""
+        headers = register_user()
+        token = requests.post(f"{BASE_URL}/api/sync", json={}, headers=headers).json()["token"]
+        started = datetime.now(timezone.utc) - timedelta(days=1)
+        attempts = [
+            {"client_id": f"bulk-{i}", "chapter": 1, "completed_at": (started + timedelta(seconds=i)).isoformat(), "score": 1, "total": 2}
+            for i in range(500)
+        ]
+        # A full sync stamps 500 attempts with one time, a second one adds another
+        assert requests.post(f"{BASE_URL}/api/sync", json={"quiz_attempts": attempts}, headers=headers).json()["applied"]["quiz_attempts"] == 500
+        extra = {"client_id": "bulk-extra", "chapter": 2, "completed_at": started.isoformat(), "score": 1, "total": 1}
+        requests.post(f"{BASE_URL}/api/sync", json={"quiz_attempts": [extra]}, headers=headers)
+        
+        pages = []
+        while len(pages) < 5:
+            data = requests.post(f"{BASE_URL}/api/sync", json={"token": token}, headers=headers).json()
+            pages.append(data)
+            token = data["token"]
+            if not data["has_more"]:
+                break
+        
+        client_ids = [a["client_id"] for page in pages for a in page["quiz_attempts"]]
+        assert len(pages) == 2 and pages[0]["has_more"]
+        assert len(client_ids) == 501 and len(set(client_ids)) == 501
+        
+        print(f"✓ Sync paged {len(client_ids)} attempts in {len(pages)} responses")
+
 class TestFlashcardsEndpoint:
     """Test /api/flashcards endpoints"""
     
@@ -108,6 +490,18 @@ class TestFlashcardsEndpoint:
             assert "category" in card
         
         print(f"✓ All flashcards endpoint returns {len(data)} flashcards")
+
+    def test_flashcards_compressed(self):
+        """Test large responses are compressed when the client accepts gzip"""
+        response = requests.get(f"{BASE_URL}/api/flashcards", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers.get("Content-Encoding") == "gzip"
+        assert len(response.json()) >= 30
+        
+        response = requests.get(f"{BASE_URL}/api/flashcards", headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in response.headers
+        
+        print(f"✓ Flashcards are served gzip-compressed on request")
     
     def test_get_flashcards_by_chapter(self):
         """Test getting flashcards for specific chapter"""
@@ -122,6 +516,46 @@ class TestFlashcardsEndpoint:
         
         print(f"✓ Chapter 1 flashcards: {len(data)} cards")
 
+    def test_due_flashcards_requires_auth(self):
+        """Test spaced repetition endpoints require authentication"""
+        response = requests.get(f"{BASE_URL}/api/flashcards/due?limit=5")
+        assert response.status_code == 401
+
+        response = requests.post(f"{BASE_URL}/api/flashcards/review", json={"reviews": [{"card_id": "f1", "grade": "good"}]})
+        assert response.status_code == 401
+
+        print(f"✓ Spaced repetition endpoints require authentication")
+
+    def test_review_schedules_cards(self):
+        """Test graded reviews move cards from new to scheduled and lapsed cards come back due"""
+        headers = register_user()
+        cards = requests.get(f"{BASE_URL}/api/flashcards/1").json()
+        first, second = cards[0]["id"], cards[1]["id"]
+        
+        response = requests.get(f"{BASE_URL}/api/flashcards/due?chapter=1&limit=50", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["due_count"] == 0 and data["new_count"] == len(cards)
+        
+        # "good" on a new card schedules it one day out, a second "good" six days after that
+        response = requests.post(f"{BASE_URL}/api/flashcards/review", json={"reviews": [{"card_id": first, "grade": "good"}]}, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["cards"][first]["interval_days"] == 1
+        response = requests.post(f"{BASE_URL}/api/flashcards/review", json={"reviews": [{"card_id": first, "grade": "good"}]}, headers=headers)
+        assert response.json()["cards"][first]["interval_days"] == 6
+        
+        # A lapse an hour ago is due again after six minutes
+        an_hour_ago = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+        response = requests.post(f"{BASE_URL}/api/flashcards/review", json={"reviews": [{"card_id": second, "grade": "again", "reviewed_at": an_hour_ago}]}, headers=headers)
+        assert response.status_code == 200
+        
+        data = requests.get(f"{BASE_URL}/api/flashcards/due?chapter=1&limit=50", headers=headers).json()
+        assert data["due_count"] == 1 and data["new_count"] == len(cards) - 2
+        assert data["cards"][0]["id"] == second and data["cards"][0]["status"] == "due"
+        assert first not in [card["id"] for card in data["cards"]]
+        
+        print(f"✓ Reviews schedule cards: {data['due_count']} due, {data['new_count']} new")
+
 class TestAIProvidersEndpoint:
     """Test /api/ai/providers endpoint - NEW FEATURE"""
     
@@ -220,6 +654,54 @@ class TestAIExplainEndpoint:
         # Should return error for invalid provider
         assert response.status_code in [400, 422, 200]
         print(f"✓ AI explain endpoint handles invalid provider")
+    
+    def test_ai_explain_stream_with_invalid_provider(self):
+        """Test streaming AI explain endpoint rejects unknown providers"""
+        payload = {
+            "question": "What is LVM?",
+            "options": ["Option A", "Option B", "Option C", "Option D"],
+            "correct_answer": 0,
+            "provider": "invalid_provider",
+            "api_key": "test_key",
+            "language": "en"
+        }
+        response = requests.post(f"{BASE_URL}/api/ai/explain/stream", json=payload)
+        assert response.status_code == 400
+        print(f"✓ AI explain stream endpoint rejects invalid provider")
+
+class TestAdminExportEndpoint:
+    """Test /api/admin/export endpoint"""
+
+    def test_export_requires_admin_token(self):
+        """Test bulk export is refused without a valid admin token"""
+        response = requests.get(f"{BASE_URL}/api/admin/export")
+        assert response.status_code == 403
+
+        response = requests.get(f"{BASE_URL}/api/admin/export", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 403
+
+        print(f"✓ Admin export requires a valid token")
+
+class TestMetricsEndpoint:
+    """Test /api/metrics endpoint"""
+
+    def test_get_metrics(self):
+        """Test metrics endpoint exposes hashing queue and auth cache counters"""
+        response = requests.get(f"{BASE_URL}/api/metrics")
+        assert response.status_code == 200
+        data = response.json()
+        hashing = data["password_hashing"]
+        for key in ("workers", "max_queue", "pending", "peak_pending", "completed", "rejected"):
+            assert key in hashing
+
+        for cache in ("token_cache", "user_cache", "ai_explanation_cache"):
+            assert "hits" in data[cache]
+            assert "misses" in data[cache]
+        assert "p50_ms" in data["ai_stream_ttft"]
+        assert "waiters" in data["ai_single_flight"]
+        assert "worker_id" in data["cache_bus"]
+
+        print(f"✓ Metrics endpoint returns: {list(data)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+"""
+Content build tests: validation and bank builds, no running server needed
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import content_store
+
+
+def question(question_id, chapter=1, **fields):
+    return {"id": question_id, "chapter": chapter, "question": "Which command lists files?",
+            "options": ["ls", "cd"], "correct_answer": 0, "explanation": "ls lists files", **fields}
+
+
+def flashcard(card_id, chapter=1):
+    return {"id": card_id, "chapter": chapter, "front": "ls", "back": "lists files", "category": "commands"}
+
+
+def write_sources(content_dir: Path, questions, flashcards):
+    (content_dir / "questions.json").write_text(json.dumps({"format": 1, "questions": questions}), encoding="utf-8")
+    (content_dir / "flashcards.json").write_text(json.dumps({"format": 1, "flashcards": flashcards}), encoding="utf-8")
+
+
+class TestValidate:
+    """Test content_store.validate"""
+
+    def test_valid_sources(self):
+        """Test well-formed sources produce no errors"""
+        sources = {"questions": [question("q1"), question("q2", chapter=2)], "flashcards": [flashcard("f1")]}
+        assert content_store.validate(sources, {1, 2}) == []
+        print(f"✓ Valid sources pass validation")
+
+    def test_reports_every_problem(self):
+        """Test validation lists each broken record instead of stopping at the first"""
+        sources = {
+            "questions": [
+                question("q1"),
+                question("q1"),
+                question("q2", correct_answer=5),
+                question("q3", chapter=9),
+                question("q4", options=["only one"]),
+                question("q5", correct_answer=True),
+            ],
+            "flashcards": [{"id": "f1", "chapter": 1, "front": "ls"}],
+        }
+        errors = content_store.validate(sources, {1, 2})
+        assert any("duplicate id" in e for e in errors)
+        assert any("correct_answer out of range" in e for e in errors)
+        assert any("unknown chapter 9" in e for e in errors)
+        assert any("at least two non-empty options" in e for e in errors)
+        assert any("(q5): 'correct_answer' must be int" in e for e in errors)
+        assert any("(f1): 'back' must be str" in e for e in errors)
+        print(f"✓ Validation reports {len(errors)} problems")
+
+
+class TestBuild:
+    """Test content_store.build and ContentBank"""
+
+    def test_build_and_read_back(self, tmp_path):
+        """Test a build writes a bank whose chapters and ids read back as the sources"""
+        questions = [question("q1"), question("q2", chapter=2), question("q3")]
+        write_sources(tmp_path, questions, [flashcard("f1", chapter=2)])
+        index = content_store.build(tmp_path, {1, 2})
+        assert not content_store.needs_build(tmp_path)
+
+        bank = content_store.ContentBank(tmp_path / content_store.BUILD_DIR)
+        try:
+            assert bank.version == index["version"]
+            assert [q["id"] for q in bank.chapter("questions", 1)] == ["q1", "q3"]
+            assert bank.get("questions", "q2") == questions[1]
+            assert bank.count("flashcards", 2) == 1 and bank.count("flashcards", 1) == 0
+        finally:
+            bank.close()
+        print(f"✓ Built bank {index['version']} reads back")
+
+    def test_invalid_sources_are_not_built(self, tmp_path):
+        """Test a failing validation raises ContentError and writes nothing"""
+        write_sources(tmp_path, [question("q1", correct_answer=3)], [])
+        with pytest.raises(content_store.ContentError) as excinfo:
+            content_store.build(tmp_path)
+        assert "correct_answer out of range" in str(excinfo.value)
+        assert not (tmp_path / content_store.BUILD_DIR).exists()
+        print(f"✓ Invalid sources are rejected")
+
+    def test_rebuild_survives_undeletable_stale_bank(self, tmp_path, monkeypatch):
+        """Test a stale bank that cannot be removed (mapped on Windows) does not fail the build"""
+        write_sources(tmp_path, [question("q1")], [])
+        first = content_store.build(tmp_path)
+        write_sources(tmp_path, [question("q1"), question("q2")], [])
+
+        def unlink_in_use(self, missing_ok=False):
+            raise PermissionError(13, "The process cannot access the file", str(self))
+        monkeypatch.setattr(Path, "unlink", unlink_in_use)
+        second = content_store.build(tmp_path)
+
+        assert second["version"] != first["version"]
+        assert (tmp_path / content_store.BUILD_DIR / first["bank"]).exists()
+        assert not content_store.needs_build(tmp_path)
+        print(f"✓ Build {second['version']} kept the stale bank {first['bank']}")
@@ -65,22 +65,15 @@ export default function Quiz() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const requests = [
-          axios.get(`${API}/questions/${chapter}?limit=10`),
-          axios.get(`${API}/chapters`)
-        ];
+        // Questions, chapters and (if AI is enabled) providers in one round trip
+        const { data } = await axios.get(`${API}/bootstrap`, {
+          params: { chapter, limit: 10, providers: aiEnabled, study_plan: false }
+        });
+        setQuestions(data.questions);
+        setChapterInfo(data.chapters.find(c => c.id === parseInt(chapter)));
         
-        // Only fetch AI providers if AI is enabled
-        if (aiEnabled) {
-          requests.push(axios.get(`${API}/ai/providers`));
-        }
-        
-        const [questionsRes, chaptersRes, providersRes] = await Promise.all(requests);
-        setQuestions(questionsRes.data);
-        setChapterInfo(chaptersRes.data.find(c => c.id === parseInt(chapter)));
-        
-        if (providersRes) {
-          setAiProviders(providersRes.data);
+        if (data.providers) {
+          setAiProviders(data.providers);
         }
         
         // Load saved AI settings